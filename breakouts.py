@@ -0,0 +1,187 @@
+"""Breakout detection against rolling per-channel, per-format baselines
+
+Each (channel, is_short) pair keeps its most recent videos. View counts grow with age,
+so log views are first adjusted for age: adjusted = log views - slope * log(age in hours),
+with the slope fitted per format within channels (how much views grow as a video gets
+older). The baseline is the median and MAD of adjusted log views, and a video's breakout
+score is its robust z-score against its own channel and format at its own age. A
+six-hour-old upload is judged against what the channel's videos typically have after six
+hours, a small channel's hit ranks next to a big channel's, and a Short is judged
+against Shorts.
+"""
+import threading
+from datetime import datetime, timezone
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+# Videos per (channel, format) the baseline remembers, newest first
+BASELINE_WINDOW = 200
+# Below this many videos a baseline is too noisy to score against
+MIN_BASELINE_VIDEOS = 5
+# MAD scaled by this is comparable to a standard deviation for normal data
+MAD_SCALE = 1.4826
+# Growth of log views per log hour of age, used until the history can fit its own
+DEFAULT_AGE_SLOPE = 0.5
+MIN_SLOPE_VIDEOS = 30
+
+
+def age_hours(published_at: pd.Series, now: datetime) -> np.ndarray:
+    """Hours since publishing, at least one so brand-new uploads stay finite on a log scale
+
+    Plain datetime64 arithmetic on the column's UTC values (naive columns are read as UTC);
+    going through pd.to_datetime and Timedelta Series costs several times more on large frames.
+    """
+    now = pd.Timestamp(now)
+    if now.tzinfo is not None:
+        now = now.tz_convert(None)
+    # NaT publish times come out as NaN ages
+    return np.maximum((now.to_datetime64() - published_at.values) / np.timedelta64(1, 'h'), 1.0)
+
+
+class ChannelBaselines:
+    """Rolling median / MAD of age-adjusted log views per (channel, is_short), updated as datasets arrive"""
+
+    def __init__(self, window: int = BASELINE_WINDOW):
+        self.window = window
+        self._history = pd.DataFrame({
+            'id': pd.Series(dtype=object), 'channel': pd.Series(dtype=object),
+            'is_short': pd.Series(dtype=bool), 'published_at': pd.Series(dtype='datetime64[ns, UTC]'),
+            'log_views': pd.Series(dtype=float), 'log_age': pd.Series(dtype=float)
+        })
+        self.baselines = pd.DataFrame(
+            {'median': pd.Series(dtype=float), 'mad': pd.Series(dtype=float), 'videos': pd.Series(dtype=int)},
+            index=pd.MultiIndex.from_arrays([[], []], names=['channel', 'is_short'])
+        )
+        self.age_slope = {False: DEFAULT_AGE_SLOPE, True: DEFAULT_AGE_SLOPE}
+        self._folded = set()
+        self._channel_codes = (None, None, None)
+        # channel -> [[median, mad, videos] for Regular, for Shorts], the array form of baselines
+        self._table = {}
+        self._lock = threading.Lock()
+
+    def _fit_age_slope(self, history: pd.DataFrame):
+        # Within-channel slope: demeaning per (channel, format) keeps big channels' older
+        # back catalogue from reading as growth with age
+        for is_short, group in history.groupby('is_short'):
+            if len(group) < MIN_SLOPE_VIDEOS:
+                continue
+            keys = [group['channel']]
+            x = group['log_age'] - group.groupby(keys)['log_age'].transform('mean')
+            y = group['log_views'] - group.groupby(keys)['log_views'].transform('mean')
+            spread = float((x * x).sum())
+            if spread > 1e-6:
+                self.age_slope[bool(is_short)] = float(np.clip((x * y).sum() / spread, 0.0, 1.5))
+
+    def update(self, df: pd.DataFrame, now: datetime = None):
+        """Fold df's videos (latest view counts win) into the history, once per dataset
+
+        Datasets are recognised by their cache token (or size and total views when they
+        have none), so reruns that only change widgets cost nothing.
+        """
+        if len(df) == 0:
+            return
+        fingerprint = df.attrs.get('cache_token') or (len(df), int(df['views'].sum()))
+        if fingerprint in self._folded:
+            return
+        now = now or datetime.now(timezone.utc)
+        incoming = df[['id', 'channel', 'is_short']].assign(
+            published_at=pd.to_datetime(df['published_at'], utc=True),
+            log_views=np.log1p(df['views'].to_numpy(float)),
+            log_age=np.log(age_hours(df['published_at'], now))
+        )
+        with self._lock:
+            history = pd.concat([self._history, incoming]).drop_duplicates('id', keep='last')
+            history = history.sort_values('published_at', ascending=False)
+            history = history[history.groupby(['channel', 'is_short']).cumcount() < self.window]
+            self._history = history
+            self._fit_age_slope(history)
+
+            # The slope may have moved, so every group is recomputed (at most window rows each)
+            slope = history['is_short'].map(self.age_slope).to_numpy(float)
+            adjusted = history.assign(adjusted=history['log_views'].to_numpy() - slope * history['log_age'].to_numpy())
+            groups = adjusted.groupby(['channel', 'is_short'])['adjusted']
+            median = groups.transform('median')
+            self.baselines = pd.DataFrame({
+                'median': groups.median(),
+                'mad': (adjusted['adjusted'] - median).abs().groupby([adjusted['channel'], adjusted['is_short']]).median(),
+                'videos': groups.size()
+            })
+            table = self.baselines.unstack('is_short').reindex(columns=[False, True], level='is_short')
+            table = table.reindex(columns=pd.MultiIndex.from_product([['median', 'mad', 'videos'], [False, True]]))
+            self._table = {channel: values.reshape(3, 2).T for channel, values in zip(table.index, table.to_numpy(float))}
+            # Tokens rotate as channels refresh; remembering the recent ones is enough
+            if len(self._folded) > 256:
+                self._folded.clear()
+            self._folded.add(fingerprint)
+
+    def _lookup(self, df: pd.DataFrame, now: datetime, scored_only: bool):
+        """Per-row (rows, thin, median, spread, age_term, views) for score() and top()
+
+        rows is every position, or with scored_only just those whose baseline is thick
+        enough to score.
+        """
+        # Slices inherit attrs, so the length is part of the key
+        token = df.attrs.get('cache_token')
+        key = None if token is None else (token, len(df))
+        if key is not None and self._channel_codes[0] == key:
+            codes, channels = self._channel_codes[1:]
+        else:
+            codes, channels = pd.factorize(df['channel'])
+            if key is not None:
+                # Reruns score the same dataset, so its channel codes are worth keeping
+                self._channel_codes = (key, codes, channels)
+        # Look baselines up through a small (channel x format) array instead of a per-video index join
+        unknown = np.full((2, 3), np.nan)
+        table = np.concatenate([self._table.get(channel, unknown) for channel in channels] or [unknown])
+        is_short = df['is_short'].to_numpy(dtype=bool)
+        position = codes * 2 + is_short
+        thin = ~(table[:, 2] >= MIN_BASELINE_VIDEOS)[position]
+        rows, published, views = np.arange(len(df)), df['published_at'], df['views'].to_numpy(float)
+        if scored_only and thin.any():
+            rows = np.flatnonzero(~thin)
+            position, is_short, thin, views = position[rows], is_short[rows], thin[rows], views[rows]
+            published = published.iloc[rows]
+        age_term = np.where(is_short, self.age_slope[True], self.age_slope[False]) * np.log(age_hours(published, now))
+        # A floor on MAD keeps channels with near-identical view counts from producing huge scores
+        spread = np.maximum(table[:, 1][position] * MAD_SCALE, 0.1)
+        return rows, thin, table[:, 0][position], spread, age_term, views
+
+    def score(self, df: pd.DataFrame, now: datetime = None) -> pd.DataFrame:
+        """df with baseline_views (typical views at the video's age), views_multiple and breakout_score
+
+        The last two are NaN where the baseline is too thin.
+        """
+        _, thin, median, spread, age_term, views = self._lookup(df, now or datetime.now(timezone.utc), False)
+        expected = np.expm1(median + age_term)
+        return df.assign(
+            baseline_views=expected,
+            views_multiple=np.where(thin, np.nan, views / np.maximum(expected, 1)),
+            breakout_score=np.where(thin, np.nan, (np.log1p(views) - age_term - median) / spread)
+        )
+
+    def top(self, df: pd.DataFrame, n: int, now: datetime = None) -> pd.DataFrame:
+        """The n highest-scoring rows of df, best first, with score()'s columns
+
+        Only rows with a usable baseline are scored and only the winners get the other
+        columns and a copy, so it costs about as much as an nlargest over the frame.
+        """
+        rows, _, median, spread, age_term, views = self._lookup(df, now or datetime.now(timezone.utc), True)
+        score = (np.log1p(views) - age_term - median) / spread
+        candidates = np.flatnonzero(~np.isnan(score))
+        if len(candidates) > n:
+            candidates = candidates[np.argpartition(-score[candidates], n - 1)[:n]]
+        best = candidates[np.argsort(-score[candidates], kind='stable')]
+        expected = np.expm1(median[best] + age_term[best])
+        winners = df.iloc[rows[best]]
+        # One concat is cheaper than assign's copy plus a block insert per column
+        return pd.concat([winners, pd.DataFrame({
+            'baseline_views': expected,
+            'views_multiple': views[best] / np.maximum(expected, 1),
+            'breakout_score': score[best]
+        }, index=winners.index)], axis=1)
+
+
+@st.cache_resource
+def get_channel_baselines() -> ChannelBaselines:
+    return ChannelBaselines()
@@ -0,0 +1,132 @@
+"""Process-wide LRU caches with a memory budget and per-entry size reporting
+
+Values are shared, not copied: every session that hits an entry gets the same object.
+DataFrames are safe to share because pandas copy-on-write turns any write by one
+session into a private copy (always on from pandas 3, switched on here for pandas 2).
+Everything else stored here must be treated as read-only by callers.
+"""
+import sys
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Hashable, Optional
+import pandas as pd
+
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.set_option('mode.copy_on_write', True)
+
+
+def estimate_size(value) -> int:
+    """Approximate bytes held by value (deep for DataFrames and JSON-like containers)"""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=True))
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(estimate_size(v) for v in value)
+    return size
+
+
+@dataclass
+class CacheEntry:
+    value: object
+    size: int
+    created: float
+    expires: float
+    label: str
+    hits: int = 0
+
+
+class BoundedCache:
+    """Thread-safe LRU cache bounded by total estimated bytes, with optional per-entry TTL"""
+
+    def __init__(self, name: str, budget_bytes: int, default_ttl: Optional[float] = None):
+        self.name = name
+        self.budget_bytes = budget_bytes
+        self.default_ttl = default_ttl
+        self._entries: "OrderedDict[Hashable, CacheEntry]" = OrderedDict()
+        self._key_locks = {}
+        self._lock = threading.Lock()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _get_entry(self, key: Hashable) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires <= time.monotonic():
+                self._drop(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            entry.hits += 1
+            self.hits += 1
+            return entry
+
+    def get(self, key: Hashable, default=None):
+        entry = self._get_entry(key)
+        return default if entry is None else entry.value
+
+    def put(self, key: Hashable, value, ttl=None, label: str = None):
+        """Store value, evicting least recently used entries until the budget holds
+
+        ttl is seconds, or a function of value returning seconds, for entries whose
+        lifetime depends on what was fetched.
+        """
+        ttl = self.default_ttl if ttl is None else ttl(value) if callable(ttl) else ttl
+        now = time.monotonic()
+        entry = CacheEntry(value, estimate_size(value), now, now + ttl if ttl else float('inf'), label or str(key))
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = entry
+            self.total_bytes += entry.size
+            # The newest entry always stays, even when it alone is over budget
+            while self.total_bytes > self.budget_bytes and len(self._entries) > 1:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def get_or_compute(self, key: Hashable, compute: Callable, ttl=None, label: str = None):
+        """Cached value for key, computing it once even when several sessions ask at the same time"""
+        entry = self._get_entry(key)
+        if entry is not None:
+            return entry.value
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            with self._lock:
+                entry = self._entries.get(key)
+            if entry is None or entry.expires <= time.monotonic():
+                # Exceptions propagate and nothing is stored, so failures are never cached
+                value = compute()
+                self.put(key, value, ttl, label)
+            else:
+                value = entry.value
+        with self._lock:
+            self._key_locks.pop(key, None)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+    def _drop(self, key: Hashable):
+        self.total_bytes -= self._entries.pop(key).size
+
+    def report(self) -> pd.DataFrame:
+        """One row per entry, most recently used first: label, size, age and hits"""
+        now = time.monotonic()
+        with self._lock:
+            rows = [
+                {'entry': e.label, 'size_kb': e.size / 1024, 'age_min': (now - e.created) / 60, 'hits': e.hits}
+                for e in reversed(self._entries.values())
+            ]
+        return pd.DataFrame(rows, columns=['entry', 'size_kb', 'age_min', 'hits'])
@@ -0,0 +1,185 @@
+"""Dashboard pieces that render the same in Streamlit and in static report snapshots
+
+Everything here returns HTML strings or Plotly figures; dash.py places them on the page
+and report_snapshot.py writes them into a standalone file.
+"""
+from typing import List
+import pandas as pd
+
+from youtube_data import overview_totals, channel_format_totals
+
+
+def format_count(value: float) -> str:
+    """1.2M / 340K / 999 style number"""
+    if value >= 1_000_000:
+        return f"{value/1_000_000:.1f}M"
+    if value >= 1_000:
+        return f"{value/1_000:.0f}K"
+    return f"{value:.0f}"
+
+def format_change(change_pct, label: str) -> str:
+    """Trend line for a metric card, empty when there is no baseline yet"""
+    if change_pct is None or pd.isna(change_pct):
+        return ""
+    direction = "positive" if change_pct >= 0 else "negative"
+    arrow = "▲" if change_pct >= 0 else "▼"
+    return f'<div class="change {direction}">{arrow} {abs(change_pct):.1f}% {label}</div>'
+
+def overview_cards(df: pd.DataFrame, window_vs_last_week: pd.DataFrame = None) -> List[str]:
+    """HTML for the four overview metric cards
+
+    window_vs_last_week is period_over_period for df's own window with a 7-day lag, so the
+    Total Views change describes the same total the card shows.
+    """
+    totals = overview_totals(df)
+    views_change = None
+    if window_vs_last_week is not None and not window_vs_last_week['previous_views'].isna().any():
+        previous_views = window_vs_last_week['previous_views'].sum()
+        if previous_views > 0:
+            views_change = (window_vs_last_week['views'].sum() - previous_views) / previous_views * 100
+
+    total_videos = """
+        <div class="metric-card" style="min-height: 150px;">
+            <h3>Total Videos</h3>
+            <div class="value">{:,}</div>
+            <div class="change positive">{} Shorts, {} Regular</div>
+        </div>
+    """.format(totals['total_videos'], totals['shorts'], totals['regular'])
+
+    total_views = """
+        <div class="metric-card" style="min-height: 150px;">
+            <h3>Total Views</h3>
+            <div class="value">{}</div>
+            <div class="change positive">Avg: {}/video</div>
+            {}
+        </div>
+    """.format(
+        format_count(totals['total_views']) if totals['total_views'] >= 1_000 else f"{totals['total_views']/1_000:.0f}K",
+        format_count(totals['avg_views']),
+        format_change(views_change, "week over week")
+    )
+
+    total_engagement = """
+        <div class="metric-card" style="min-height: 150px;">
+            <h3>Total Engagement</h3>
+            <div class="value">{}</div>
+            <div class="change positive">{:.1f}% rate</div>
+        </div>
+    """.format(format_count(totals['total_engagement']), totals['engagement_rate'])
+
+    top_channel = """
+        <div class="metric-card" style="min-height: 150px;">
+            <h3>Top Channel</h3>
+            <div class="value" style="font-size: 28px; line-height: 1.2;">{}</div>
+            <div class="change positive">{} views</div>
+        </div>
+    """.format(
+        totals['top_channel'],
+        format_count(totals['top_channel_views']) if totals['top_channel_views'] >= 1_000 else f"{totals['top_channel_views']/1_000:.0f}K"
+    )
+    return [total_videos, total_views, total_engagement, top_channel]
+
+def format_comparison_stats(df: pd.DataFrame, selected_channels: List[str]) -> pd.DataFrame:
+    """Per-channel Shorts / Regular totals indexed by channel, smallest first (empty without data)"""
+    # Per-channel totals, including selected channels without videos
+    channel_format_stats = channel_format_totals(df, selected_channels)
+    if channel_format_stats.empty:
+        return channel_format_stats
+    return channel_format_stats.set_index('channel').sort_values('Total', ascending=True)
+
+def format_comparison_figure(channel_format_stats: pd.DataFrame):
+    """Stacked Shorts vs Regular views per channel (stats indexed by channel, smallest first)"""
+    import plotly.graph_objects as go
+    fig = go.Figure()
+
+    if 'Regular Videos' in channel_format_stats.columns:
+        fig.add_trace(go.Bar(
+            y=channel_format_stats.index,
+            x=channel_format_stats['Regular Videos'],
+            name='Regular Videos',
+            orientation='h',
+            marker_color='#E6DDC1',
+            text=[f"{val/1_000_000:.1f}M" if val >= 1_000_000 else f"{val/1_000:.0f}K" if val >= 1_000 else ""
+                for val in channel_format_stats['Regular Videos']],
+            textposition='inside',
+            textfont=dict(color='#221F1F', size=11, family='Inter'),
+            hovertemplate='%{y}<br>Regular Videos: %{x:,.0f}<extra></extra>'
+        ))
+
+    if 'Shorts' in channel_format_stats.columns:
+        fig.add_trace(go.Bar(
+            y=channel_format_stats.index,
+            x=channel_format_stats['Shorts'],
+            name='Shorts',
+            orientation='h',
+            marker_color='#BCE5F7',
+            text=[f"{val/1_000_000:.1f}M" if val >= 1_000_000 else f"{val/1_000:.0f}K" if val >= 1_000 else ""
+                for val in channel_format_stats['Shorts']],
+            textposition='inside',
+            textfont=dict(color='#221F1F', size=11, family='Inter'),
+            hovertemplate='%{y}<br>Shorts: %{x:,.0f}<extra></extra>'
+        ))
+
+    fig.update_layout(
+        title="Total Views by Channel (Shorts vs Regular Videos)",
+        xaxis_title="Views",
+        yaxis_title="",
+        font=dict(family="Inter"),
+        height=500,
+        barmode='stack',
+        showlegend=True,
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="right",
+            x=1
+        ),
+        xaxis=dict(
+            tickformat='.2s',
+            gridcolor='rgba(0,0,0,0.1)'
+        ),
+        yaxis=dict(
+            categoryorder='total ascending'
+        ),
+        plot_bgcolor='white',
+        margin=dict(l=150, r=50, t=80, b=50)
+    )
+    return fig
+
+def format_breakdown(df: pd.DataFrame, shorts: bool) -> pd.DataFrame:
+    """Total / average views and video count per channel for one format, biggest first"""
+    by_channel = df[df['is_short'] == shorts].groupby('channel').agg({
+        'views': ['sum', 'mean', 'count']
+    }).round(0)
+    by_channel.columns = ['total_views', 'avg_views', 'video_count']
+    return by_channel.sort_values('total_views', ascending=False)
+
+def format_totals_figure(by_channel: pd.DataFrame, shorts: bool):
+    """Total views per channel for one format (Tab 2)"""
+    import plotly.graph_objects as go
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=by_channel.index,
+        y=by_channel['total_views'],
+        marker_color='#BCE5F7' if shorts else '#E6DDC1',
+        text=[f"{v/1_000_000:.1f}M" if v >= 1_000_000 else f"{v/1000:.0f}K" if v >= 1000 else f"{v:.0f}" for v in by_channel['total_views']],
+        textposition='outside',
+        hovertemplate='%{x}<br>Total Views: %{y:,.0f}<extra></extra>'
+    ))
+
+    fig.update_layout(
+        title="Total Views - Shorts" if shorts else "Total Views - Regular Videos",
+        xaxis_title="",
+        yaxis_title="Total Views",
+        font=dict(family="Inter"),
+        height=350,
+        xaxis_tickangle=-45,
+        yaxis=dict(
+            gridcolor='rgba(0,0,0,0.1)',
+            range=[0, by_channel['total_views'].max() * 1.2]
+        ),
+        plot_bgcolor='white',
+        margin=dict(t=50, b=40)
+    )
+    return fig
@@ -1,32 +1,37 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
-import plotly.graph_objects as go
-import plotly.express as px
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
-import openai
-import json
-import time
-from typing import Dict, List, Tuple
-import isodate
+from datetime import date, datetime, timedelta
+from typing import List
 # Add these lines after the existing imports at the top of dashboard.py
 from dotenv import load_dotenv
 import os
+import urllib.error
+from youtube_data import (
+    APP_DIR, CHANNEL_REGISTRY_PATH, RESPONSE_SHAPING,
+    get_key_ring, get_payload_meter, get_retry_policy, get_freshness_scheduler, load_channel_registry, get_time_range_dates,
+    stream_channels_data, combine_channel_frames, clear_video_cache, get_video_cache,
+    get_daily_store, period_over_period
+)
+from title_analytics import TitleIndex
+from breakouts import get_channel_baselines
+from video_index import DURATION_BUCKETS, get_video_index
+from llm_calls import LLM_DAILY_BUDGET_USD, get_llm_usage_log
+from strategic_insights import get_llm_caller, generate_ai_insights
+from report_snapshot import REPORT_TIME_RANGE, snapshot_path, latest_snapshot, ensure_snapshot, invalidate_snapshots
+from components import (
+    overview_cards, format_comparison_stats, format_comparison_figure, format_breakdown, format_totals_figure
+)
 
 # Load environment variables
 load_dotenv()
 
-# Get API keys from environment
-DEFAULT_YOUTUBE_KEYS = [
-    os.getenv('YOUTUBE_API_KEY', ''),
-    os.getenv('YOUTUBE_API_KEY_2', ''),
-    os.getenv('YOUTUBE_API_KEY_3', '')
-]
-DEFAULT_YOUTUBE_KEYS = [key for key in DEFAULT_YOUTUBE_KEYS if key]  # Remove empty keys
+# Get API keys from environment (YouTube keys are read and rotated in youtube_data)
 DEFAULT_OPENAI_KEY = os.getenv('OPENAI_API_KEY', '')
 
+# Point at a running data_service.py to share one fetch across dashboard replicas
+DATA_SERVICE_URL = os.getenv('DATA_SERVICE_URL', '')
+
 # Page config
 st.set_page_config(
     page_title="Multi-Channel Competitor Dashboard",
@@ -34,311 +39,77 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Custom CSS based on your design system
-st.markdown("""
-<style>
-@import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700;800;900&display=swap');
-
-:root {
-  --primary-text: #221F1F;
-  --accent-blue: #BCE5F7;
-  --secondary-beige: #E6DDC1;
-  --background: #FFFFFF;
-  --footer-grey: #666666;
-}
-
-.main .block-container {
-  padding-top: 2rem;
-  max-width: 1400px;
-  padding-left: 3rem;
-  padding-right: 3rem;
-}
-
-/* Hero section */
-.dashboard-header {
-  font-family: 'Inter', sans-serif;
-  font-size: 72px;
-  font-weight: 900;
-  text-transform: uppercase;
-  color: var(--primary-text);
-  line-height: 0.9;
-  letter-spacing: -3px;
-  margin-bottom: 1rem;
-}
-
-.dashboard-header .accent {
-  color: var(--accent-blue);
-}
-
-.subheader {
-  font-family: 'Inter', sans-serif;
-  font-size: 24px;
-  font-weight: 300;
-  color: var(--primary-text);
-  margin-bottom: 2rem;
-}
-
-/* Metric cards */
-.metric-card {
-  background: white;
-  border: 1px solid #e0e0e0;
-  border-radius: 8px;
-  padding: 1.5rem;
-  margin-bottom: 1rem;
-  box-shadow: 0 2px 4px rgba(0,0,0,0.05);
-}
-
-.metric-card h3 {
-  font-family: 'Inter', sans-serif;
-  font-size: 14px;
-  font-weight: 600;
-  text-transform: uppercase;
-  letter-spacing: 1px;
-  color: #666;
-  margin-bottom: 0.5rem;
-}
-
-.metric-card .value {
-  font-family: 'Inter', sans-serif;
-  font-size: 32px;
-  font-weight: 800;
-  color: var(--primary-text);
-}
-
-.metric-card .change {
-  font-family: 'Inter', sans-serif;
-  font-size: 14px;
-  font-weight: 500;
-  margin-top: 0.5rem;
-}
-
-.metric-card .change.positive {
-  color: #10b981;
-}
-
-.metric-card .change.negative {
-  color: #ef4444;
-}
-
-/* Buttons */
-.stButton > button {
-  background: var(--accent-blue);
-  color: var(--primary-text);
-  border: none;
-  font-family: 'Inter', sans-serif;
-  font-weight: 700;
-  font-size: 14px;
-  text-transform: uppercase;
-  letter-spacing: 1px;
-  border-radius: 4px;
-  padding: 0.75rem 1.5rem;
-  transition: all 0.3s ease;
-}
-
-.stButton > button:hover {
-  background: var(--primary-text);
-  color: var(--accent-blue);
-  transform: translateY(-1px);
-  box-shadow: 0 4px 12px rgba(0,0,0,0.15);
-}
-
-/* Section headers */
-h1, h2, h3 {
-  font-family: 'Inter', sans-serif;
-  font-weight: 800;
-  color: var(--primary-text);
-}
-
-/* AI Analysis box */
-.ai-analysis {
-  background: #f8f9fa;
-  border-left: 4px solid var(--accent-blue);
-  padding: 1.5rem;
-  margin: 1.5rem 0;
-  font-family: 'Inter', sans-serif;
-  border-radius: 4px;
-}
+# Custom CSS based on your design system (read from disk once per process)
+@st.cache_resource
+def load_stylesheet() -> str:
+    with open(os.path.join(APP_DIR, 'assets', 'dashboard.css')) as f:
+        return f"<style>\n{f.read()}</style>"
 
-.ai-analysis h4 {
-  font-weight: 700;
-  text-transform: uppercase;
-  letter-spacing: 0.5px;
-  margin-bottom: 1rem;
-  color: var(--primary-text);
-}
-
-/* Data tables */
-.dataframe {
-  font-family: 'Inter', sans-serif !important;
-  font-size: 14px;
-}
-
-.dataframe th {
-  background-color: var(--secondary-beige) !important;
-  font-weight: 700 !important;
-  text-transform: uppercase !important;
-  letter-spacing: 0.5px !important;
-}
-
-/* Tabs */
-.stTabs [data-baseweb="tab-list"] {
-  gap: 2rem;
-  border-bottom: 2px solid #e0e0e0;
-}
-
-.stTabs [data-baseweb="tab"] {
-  font-family: 'Inter', sans-serif;
-  font-weight: 600;
-  font-size: 14px;
-  text-transform: uppercase;
-  letter-spacing: 0.5px;
-}
-
-.stTabs [aria-selected="true"] {
-  color: var(--accent-blue);
-  border-bottom: 3px solid var(--accent-blue);
-}
-</style>
-""", unsafe_allow_html=True)
+st.markdown(load_stylesheet(), unsafe_allow_html=True)
 
 # Initialize session state
 if 'youtube_data' not in st.session_state:
     st.session_state.youtube_data = {}
-if 'current_key_index' not in st.session_state:
-    st.session_state.current_key_index = 0
 if 'last_refresh' not in st.session_state:
     st.session_state.last_refresh = None
 if 'ai_analysis' not in st.session_state:
     st.session_state.ai_analysis = {}
 
-# Channel configurations for both dashboards
-POLITICAL_CHANNELS = {
-    'Megyn Kelly': 'UCzJXNzqz6VMHSNInQt_7q6w',
-    'Bill Maher': 'UCy6kyFxaMqGtpE3pQTflK8A',
-    'The Daily Show': 'UCwWhs_6x42TyRM4Wstoq8HA',
-    'David Pakman Show': 'UCvixJtaXuNdMPUGdOPcY8Ag',
-    'Michael Knowles': 'UCr4kgAUTFkGIwlWSodg43QA',
-    'The Weekly Show with Jon Stewart': 'UCQlJ7XpBtiMLKNSd4RAJmRQ',
-    'Brian Tyler Cohen': 'UCQANb2YPwAtK-IQJrLaaUFw',
-    'Nick Freitas': 'UCPFzA28Hw9tYDxXAeidDk6w',
-    'Matt Walsh': 'UCO01ytfzgXYy4glnPJm4PPQ',
-    'Ben Shapiro': 'UCnQC_G5Xsjhp9fEJKuIcrSw',
-    'Timcast IRL': 'UCLwNTXWEjVd2qIHLcXxQWxA',
-    'Benny Johnson': 'UCLdP3jmBYe9lAZQbY6OSYjw',
-    'Candace Owens': 'UCL0u5uz7KZ9q-pe-VC8TY-w',
-    'Dr. Jordan B. Peterson': 'UCL_f53ZEJxp8TtlOkHwMV9Q',
-    'The Rubin Report': 'UCJdKr0Bgd_5saZYqLCa9mng',
-    'Tucker Carlson': 'UCGttrUON87gWfU6dMWm1fcA',
-    'Amala Ekpunobi': 'UCgEvEKgmQ-CHPIeOSaGCffw',
-    'The Bulwark': 'UCG4Hp1KbGw4e02N7FpPXDgQ',
-    'Charlie Kirk': 'UCfaIu2jO-fppCQV_lchCRIQ',
-    'Brett Cooper': 'UCdFcGPb4xQ6X4QOoRU6ROYw',
-    'Trish Regan': 'UCBlMo25WDUKJNQ7G8sAk4Zw',
-    'The Officer Tatum': 'UCaYw_yJ_YLPEv6zR2c7hgHA',
-    'Piers Morgan Uncensored': 'UCatt7TBjfBkiJWx8khav_Gg',
-    'MeidasTouch': 'UC9r9HYFxEQOBXSopFS61ZWg',
-    'Destiny': 'UC554eY5jNUfDq3yDOJYirOQ',
-    'LastWeekTonight': 'UC3XTzVzaHQEd30rQbuvCtTQ',
-    'The Majority Report w/ Sam Seder': 'UC-3jIAlnQmbbVMV6gR7K8aQ'
-}
-
-SPORTS_CHANNELS = {
-    'Josh Pate\'s College Football Show': 'UCg-q_MDeWQrjizr1VPLEpYg',
-    'On3': 'UCn2g2Wy8uiE9BhDPV4knT7A',
-    'ESPN College Football': 'UCzRWWsFjqHk1an4OnVPsl9g',
-    'Adapt & Respond with RJ Young': 'UC2g1DShTjHNCjbQ-PC-4aHA',
-    'Cover 3 Podcast': 'UCODwphyohBn9u8-FVWfbQ7g',
-    'CFB ON FOX': 'UCpwix-O6ceqMgdxhqIynzFA',
-    'The Film Guy Network': 'UCqipe2JOIQZke4AN3-K9DJA',
-    'Bleacher Report': 'UC9-OpMMVoNP5o10_Iyq7Ndw',
-    'SEC Shorts': 'UCUOZvgB9Q8AgZjjLYcLWztQ',
-    'Locked On College Football': 'UCqNQsWmyf0LCFUKr01QZ2LQ',
-    'Strictly Football': 'UCGAOAB1tD432c5pyXMzS-6w',
-    'College Football City': 'UCrjdiWSTYMLEHGYs5yfp56Q',
-    'MattBeGreat': 'UCCQfkgVy-f814HGAwKQFPaw',
-    'See Ball Get Ball with David Pollack': 'UC3-r8FzHqjr-O3KvPU26ZEA',
-    'The Herd with Colin Cowherd': 'UCFDidMd82mpDkKijLUqHp7A',
-    'Crain & Company': 'UC-LeIYApj-NTHYGAzU4cPBQ'
-}
+@st.cache_data(ttl=300, show_spinner=False)
+def load_remote_registry(base_url: str):
+    """Dashboards and channel metadata as resolved by the data service"""
+    from data_service import remote_registry
+    return remote_registry(base_url)
 
-# Define default channels for each dashboard
-DEFAULT_POLITICAL_CHANNELS = [
-    'Ben Shapiro',
-    'Matt Walsh', 
-    'Michael Knowles',
-]
+@st.cache_data(ttl=300, max_entries=8, show_spinner=False)
+def load_remote_report(base_url: str, dashboard_key: str, day: str) -> bytes:
+    """Today's report from the data service, fetched server-side; day keys it to the build cycle"""
+    from data_service import remote_report
+    return remote_report(base_url, dashboard_key)
 
-DEFAULT_SPORTS_CHANNELS = [
-    'Crain & Company',
-    'Josh Pate\'s College Football Show',
-    'Adapt & Respond with RJ Young'
-]
-
-# Add caching for YouTube data
-@st.cache_data(ttl=21600)  # Cache for 6 hours
-def fetch_all_channels_data(channel_list, start_date, api_key, channels_dict):
-    """Fetch data for all channels with caching"""
-    all_videos = []
-    youtube = build('youtube', 'v3', developerKey=api_key)
-    failed_channels = []
-    
-    for channel_name in channel_list:
-        channel_id = channels_dict[channel_name]
-        try:
-            videos = fetch_channel_videos(youtube, channel_id, start_date)
-            if videos:
-                for video in videos:
-                    video['channel'] = channel_name
-                    all_videos.append(video)
-                st.success(f"✅ {channel_name}: {len(videos)} videos found")
-            else:
-                st.warning(f"⚠️ {channel_name}: No videos found in date range")
-        except HttpError as e:
-            error_reason = str(e)
-            if 'quotaExceeded' in error_reason:
-                st.error(f"❌ API Quota exceeded for {channel_name}")
-                failed_channels.append(f"{channel_name} (quota exceeded)")
-            elif 'channelNotFound' in error_reason or 'invalidChannelId' in error_reason:
-                st.error(f"❌ {channel_name}: Invalid channel ID - {channel_id}")
-                failed_channels.append(f"{channel_name} (invalid ID)")
-            else:
-                st.error(f"❌ {channel_name}: API Error - {error_reason}")
-                failed_channels.append(f"{channel_name} (API error)")
-        except Exception as e:
-            st.error(f"❌ {channel_name}: Unexpected error - {str(e)}")
-            failed_channels.append(f"{channel_name} (unexpected error)")
-        time.sleep(0.5)  # Rate limiting
-    
-    if failed_channels:
-        st.warning(f"Failed to fetch data for: {', '.join(failed_channels)}")
-    
-    return all_videos
+@st.cache_data(max_entries=4, show_spinner=False)
+def read_snapshot(path: str, mtime: float) -> bytes:
+    """Report file contents, reread only when the snapshot is rebuilt"""
+    with open(path, 'rb') as f:
+        return f.read()
 
 # Sidebar configuration
 with st.sidebar:
     st.markdown('<h2 style="font-family: Inter; font-weight: 800;">Configuration</h2>', unsafe_allow_html=True)
     
+    # Use API keys directly from environment
+    youtube_api_key = get_key_ring().current()
+    openai_api_key = DEFAULT_OPENAI_KEY
+    
+    if DATA_SERVICE_URL:
+        try:
+            dashboards, channel_metadata, registry_problems = load_remote_registry(DATA_SERVICE_URL)
+        except (urllib.error.URLError, TimeoutError) as e:
+            st.error(f"Data service unavailable at {DATA_SERVICE_URL}: {getattr(e, 'reason', e)}")
+            st.stop()
+    else:
+        dashboards, channel_metadata, registry_problems = load_channel_registry(
+            CHANNEL_REGISTRY_PATH, os.path.getmtime(CHANNEL_REGISTRY_PATH), youtube_api_key
+        )
+    
     # Dashboard Type Selector
     st.markdown('<h3 style="font-family: Inter; font-weight: 700;">Dashboard Type</h3>', unsafe_allow_html=True)
     dashboard_type = st.selectbox(
         "Select Dashboard",
-        ["Ben Shapiro (Political)", "Crain & Co (Sports)"],
+        [d['label'] for d in dashboards],
         index=0
     )
+    dashboard = next(d for d in dashboards if d['label'] == dashboard_type)
     
     # Set channels and defaults based on dashboard type
-    if dashboard_type == "Ben Shapiro (Political)":
-        CHANNELS = POLITICAL_CHANNELS
-        DEFAULT_CHANNELS = DEFAULT_POLITICAL_CHANNELS
-        dashboard_focus = "political"
-    else:
-        CHANNELS = SPORTS_CHANNELS
-        DEFAULT_CHANNELS = DEFAULT_SPORTS_CHANNELS
-        dashboard_focus = "sports"
+    CHANNELS = dashboard['channels']
+    DEFAULT_CHANNELS = dashboard['default_channels']
+    dashboard_focus = dashboard['focus']
     
-    # Use API keys directly from environment
-    youtube_api_key = DEFAULT_YOUTUBE_KEYS[st.session_state.current_key_index] if DEFAULT_YOUTUBE_KEYS else ''
-    openai_api_key = DEFAULT_OPENAI_KEY
+    if registry_problems:
+        with st.expander(f"⚠️ {len(registry_problems)} channel registry issue(s)"):
+            for problem in registry_problems:
+                st.markdown(f"- {problem}")
     
     st.markdown('<h3 style="font-family: Inter; font-weight: 700;">Time Range</h3>', unsafe_allow_html=True)
     time_range = st.selectbox(
@@ -371,18 +142,93 @@ with st.sidebar:
     st.markdown("---")
     
     if st.button("Refresh Data", use_container_width=True):
-        st.cache_data.clear()  # Clear cache to force refresh
-        st.rerun()
+        refreshed = True
+        if DATA_SERVICE_URL:
+            from data_service import remote_refresh
+            try:
+                remote_refresh(DATA_SERVICE_URL)
+            except urllib.error.HTTPError as e:
+                refreshed = False
+                hint = " (check DATA_SERVICE_TOKEN on this replica)" if e.code == 403 else ""
+                st.warning(f"Data service refused the refresh: {e.code} {e.reason}{hint}")
+            except (urllib.error.URLError, TimeoutError) as e:
+                refreshed = False
+                st.warning(f"Data service unavailable, nothing refreshed: {getattr(e, 'reason', e)}")
+        if refreshed:
+            st.cache_data.clear()  # Clear cache to force refresh
+            clear_video_cache()
+            invalidate_snapshots()
+            st.rerun()
+    
+    if not DATA_SERVICE_URL:
+        with st.expander("API Payload"):
+            meter = get_payload_meter()
+            st.caption("Response shaping " + ("on (fields masks)" if RESPONSE_SHAPING else "off (full payloads)"))
+            st.markdown(f"**Requests:** {meter.requests:,}")
+            st.markdown(f"**On the wire:** {meter.wire_bytes/1024:,.1f} KB")
+            st.markdown(f"**Decoded JSON:** {meter.decoded_bytes/1024:,.1f} KB")
+            retry_policy = get_retry_policy()
+            st.markdown(f"**Retries:** {retry_policy.retries:,} ({retry_policy.rate_limited:,} rate limited, "
+                        f"{retry_policy.gave_up:,} gave up)")
+            scheduler = get_freshness_scheduler()
+            st.markdown(f"**Statistics refreshed:** {scheduler.refreshed:,} videos ({scheduler.skipped:,} skipped as fresh)")
+        
+        with st.expander("Video Cache"):
+            video_cache = get_video_cache()
+            entries = video_cache.report()
+            used = video_cache.total_bytes
+            used_text = f"{used/1024**2:,.1f} MB" if used >= 1024**2 else f"{used/1024:,.0f} KB"
+            st.markdown(f"**Memory:** {used_text} of {video_cache.budget_bytes/1024**2:,.0f} MB")
+            st.markdown(f"**Entries:** {len(entries):,} ({video_cache.evictions:,} evicted)")
+            st.markdown(f"**Hits / misses:** {video_cache.hits:,} / {video_cache.misses:,}")
+            if len(entries) > 0:
+                st.dataframe(entries.head(20).round(1), hide_index=True, use_container_width=True)
+    
+    if openai_api_key:
+        with st.expander("AI Usage"):
+            usage = get_llm_usage_log().day_summary(datetime.now().strftime('%Y-%m-%d'))
+            st.markdown(f"**Calls today:** {usage['calls']:,} ({usage['failures']:,} failed)")
+            st.markdown(f"**Tokens today:** {usage['tokens']:,}")
+            st.markdown(f"**Spend today:** ${usage['cost_usd']:.2f} of ${LLM_DAILY_BUDGET_USD:.2f}")
+    
+    # Static snapshot of the default channels, built once per refresh cycle and handed out as a file
+    st.markdown("---")
+    st.markdown('<h3 style="font-family: Inter; font-weight: 700;">Executive Report</h3>', unsafe_allow_html=True)
+    st.caption(f"Default channels, {REPORT_TIME_RANGE.lower()}")
+    report_bytes, report_name = None, os.path.basename(snapshot_path(dashboard['key']))
+    if DATA_SERVICE_URL:
+        # The service is private to the replicas, so the replica fetches the file and hands it on
+        requested = st.session_state.setdefault('reports_requested', set())
+        if dashboard['key'] not in requested and st.button("Get executive report", use_container_width=True):
+            requested.add(dashboard['key'])
+        if dashboard['key'] in requested:
+            try:
+                with st.spinner("Fetching report..."):
+                    report_bytes = load_remote_report(DATA_SERVICE_URL, dashboard['key'], date.today().isoformat())
+            except Exception as e:
+                requested.discard(dashboard['key'])
+                st.warning(f"Executive report unavailable: {e}")
+    else:
+        report_path = latest_snapshot(dashboard['key'])
+        if report_path is None and st.button("Build executive report", use_container_width=True):
+            with st.spinner("Building report..."):
+                report_path = ensure_snapshot(dashboard, channel_metadata, youtube_api_key, openai_api_key or None)
+        if report_path:
+            report_bytes = read_snapshot(report_path, os.path.getmtime(report_path))
+            report_name = os.path.basename(report_path)
+    if report_bytes:
+        st.download_button(
+            "Download executive report",
+            report_bytes,
+            file_name=report_name,
+            mime='text/html',
+            use_container_width=True
+        )
 
 # Dynamic header based on dashboard type
-if dashboard_type == "Ben Shapiro (Political)":
-    header_text = "SHORTHAND STUDIOS<span style='color: #BCE5F7;'>.</span>"
-    subheader_text = "DAILY WIRE COMPETITOR ANALYTICS DASHBOARD"
-    description_text = "Real-time YouTube Performance Tracking & Strategic Insights"
-else:
-    header_text = "CRAIN & COMPANY<span style='color: #BCE5F7;'>.</span>"
-    subheader_text = "SPORTS CONTENT ANALYTICS DASHBOARD"
-    description_text = "College Football & Sports YouTube Performance Analysis"
+header_text = f"{dashboard['header']}<span style='color: #BCE5F7;'>.</span>"
+subheader_text = dashboard['subheader']
+description_text = dashboard['description']
 
 st.markdown(f"""
     <div style="font-family: 'Inter', sans-serif;">
@@ -399,166 +245,98 @@ st.markdown(f"""
 """, unsafe_allow_html=True)
 
 # Helper functions
-def get_time_range_dates(time_range: str) -> Tuple[datetime, datetime]:
-    """Convert time range string to datetime objects (excluding today)"""
-    end_date = datetime.now() - timedelta(days=1)  # Yesterday at current time
-    end_date = end_date.replace(hour=23, minute=59, second=59)  # End of yesterday
-    
-    if time_range == "Last 1 Day":
-        start_date = end_date.replace(hour=0, minute=0, second=0)  # Start of yesterday
-    elif time_range == "Last 3 Days":
-        start_date = end_date - timedelta(days=2)
-        start_date = start_date.replace(hour=0, minute=0, second=0)  # Start of day
-    else:  # Last 7 Days
-        start_date = end_date - timedelta(days=6)
-        start_date = start_date.replace(hour=0, minute=0, second=0)  # Start of day
-    
-    return start_date, end_date
+def render_overview_cards(df: pd.DataFrame, window_vs_last_week: pd.DataFrame = None):
+    """Overview metric cards for the videos fetched so far"""
+    for col, card in zip(st.columns(4), overview_cards(df, window_vs_last_week)):
+        with col:
+            st.markdown(card, unsafe_allow_html=True)
+
+def render_format_chart(df: pd.DataFrame, selected_channels: List[str], key: str) -> pd.DataFrame:
+    """Stacked Shorts vs Regular bar chart; returns the per-channel totals behind it"""
+    channel_format_stats = format_comparison_stats(df, selected_channels)
+    if not channel_format_stats.empty:
+        st.plotly_chart(format_comparison_figure(channel_format_stats), use_container_width=True, key=key)
+    return channel_format_stats
+
+@st.cache_resource
+def get_title_index() -> TitleIndex:
+    """Title index shared by every session; each run adds only the videos it has not seen"""
+    return TitleIndex()
+
+@st.cache_data(show_spinner=False, max_entries=20)
+def title_clusters(_title_index: TitleIndex, video_ids: tuple, index_version: int, threshold: float) -> np.ndarray:
+    """Story cluster label per video ID, recomputed only when the videos, index or threshold change"""
+    return _title_index.clusters(_title_index.rows_for(video_ids), threshold=threshold)
 
-def fetch_channel_videos(youtube, channel_id: str, start_date: datetime, max_results: int = 100) -> List[Dict]:
-    """Fetch ALL videos from a channel within date range using pagination"""
-    global DEFAULT_YOUTUBE_KEYS
-    
-    all_videos = []
-    next_page_token = None
-    
+# Main content area
+if (youtube_api_key or DATA_SERVICE_URL) and selected_channels:
     try:
-        while True:
-            request = youtube.search().list(
-                part="id,snippet",
-                channelId=channel_id,
-                maxResults=50,  # API allows up to 50 per page
-                order="date",
-                type="video",
-                publishedAfter=start_date.isoformat() + "Z",
-                pageToken=next_page_token  # Add pagination
-            )
-            response = request.execute()
+        # Get date range
+        start_date, end_date = get_time_range_dates(time_range)
+        
+        # Channels stream in as they finish; the overview cards and Tab 1 chart update with each one
+        fetch_status = st.status("Fetching channel data...", expanded=False)
+        progress_bar = st.progress(0.0)
+        notices = st.container()
+        layout = st.container()
+        channel_frames = {}
+        failed_channels = []
+        fetched_channels = []
+        tabs = None
+        channel_format_stats = pd.DataFrame()
+        
+        if DATA_SERVICE_URL:
+            from data_service import remote_stream_channels
+            channel_stream = remote_stream_channels(DATA_SERVICE_URL, dashboard['key'], selected_channels, time_range)
+        else:
+            channel_stream = stream_channels_data(selected_channels, start_date, youtube_api_key, CHANNELS, channel_metadata)
+        for done, (channel_name, videos, failure) in enumerate(channel_stream, start=1):
+            progress_bar.progress(done / len(selected_channels))
+            fetch_status.update(label=f"Fetched {done}/{len(selected_channels)} channels (latest: {channel_name})")
+            with fetch_status:
+                if failure:
+                    st.error(f"❌ {failure[1]}")
+                    failed_channels.append(f"{channel_name} ({failure[0]})")
+                    continue
+                fetched_channels.append(channel_name)
+                if len(videos) > 0:
+                    st.success(f"✅ {channel_name}: {len(videos)} videos found")
+                else:
+                    st.warning(f"⚠️ {channel_name}: No videos found in date range")
             
-            video_ids = [item['id']['videoId'] for item in response.get('items', [])]
+            if len(videos) == 0:
+                continue
+            # Cached channel frames are shared across sessions; this running total is only for progress
+            channel_frames[channel_name] = videos
+            df = pd.concat(channel_frames.values(), ignore_index=True)
             
-            if video_ids:
-                # Get video details including duration and statistics
-                videos_request = youtube.videos().list(
-                    part="snippet,statistics,contentDetails",
-                    id=",".join(video_ids)
-                )
-                videos_response = videos_request.execute()
-                
-                for video in videos_response.get('items', []):
-                    duration = isodate.parse_duration(video['contentDetails']['duration'])
-                    duration_seconds = duration.total_seconds()
+            if tabs is None:
+                with layout:
+                    # Overview metrics
+                    st.markdown("<div style='margin-bottom: 20px;'></div>", unsafe_allow_html=True)
+                    overview_placeholder = st.empty()
+                    st.markdown("---")
                     
-                    all_videos.append({
-                        'id': video['id'],
-                        'title': video['snippet']['title'],
-                        'published_at': video['snippet']['publishedAt'],
-                        'duration_seconds': duration_seconds,
-                        'is_short': duration_seconds <= 181,
-                        'views': int(video['statistics'].get('viewCount', 0)),
-                        'likes': int(video['statistics'].get('likeCount', 0)),
-                        'comments': int(video['statistics'].get('commentCount', 0)),
-                        'thumbnail': video['snippet']['thumbnails']['medium']['url']
-                    })
+                    # Tabs for different analyses
+                    tabs = st.tabs(["Performance Overview", "Shorts vs Videos", "Top Content", "Breakouts", "Story Clusters", "Strategic Insights"])
+                    with tabs[0]:
+                        st.markdown("### Channel Performance Comparison")
+                        chart_placeholder = st.empty()
             
-            # Check if there are more pages
-            next_page_token = response.get('nextPageToken')
-            if not next_page_token:
-                break
-                
-        return all_videos
-        
-    except HttpError as e:
-        if 'quotaExceeded' in str(e) and DEFAULT_YOUTUBE_KEYS and len(DEFAULT_YOUTUBE_KEYS) > 1:
-            st.session_state.current_key_index = (st.session_state.current_key_index + 1) % len(DEFAULT_YOUTUBE_KEYS)
-            youtube = build('youtube', 'v3', developerKey=DEFAULT_YOUTUBE_KEYS[st.session_state.current_key_index])
-            return fetch_channel_videos(youtube, channel_id, start_date, max_results)
-        else:
-            return []
-        
-def generate_ai_insights(data: pd.DataFrame, openai_client, dashboard_focus: str) -> str:
-    """Generate Strategic Insights from the data based on dashboard type"""
-    try:
-        # Get top and bottom performing videos with titles
-        top_videos = data.nlargest(10, 'views')[['title', 'views', 'channel', 'is_short']]
-        bottom_videos = data.nsmallest(10, 'views')[['title', 'views', 'channel', 'is_short']]
-        
-        # Calculate engagement rates
-        data['engagement_rate'] = ((data['likes'] + data['comments']) / data['views'] * 100).fillna(0)
-        high_engagement = data.nlargest(10, 'engagement_rate')[['title', 'engagement_rate', 'views']]
+            with overview_placeholder.container():
+                render_overview_cards(df)
+            with chart_placeholder.container():
+                channel_format_stats = render_format_chart(df, selected_channels, key=f"format_chart_{done}")
         
-        # Create detailed prompt for topic analysis
-        top_titles = "\n".join([f"- {v['title']} ({v['views']:,} views, {v['channel']})" for v in top_videos.to_dict('records')])
-        bottom_titles = "\n".join([f"- {v['title']} ({v['views']:,} views, {v['channel']})" for v in bottom_videos.to_dict('records')])
-        high_engagement_titles = "\n".join([f"- {v['title']} ({v['engagement_rate']:.1f}% engagement, {v['views']:,} views)" for v in high_engagement.to_dict('records')])
-        
-        if dashboard_focus == "political":
-            content_type = "conservative political commentary"
-            context_note = "ALL content is political, so don't mention that politics works - be VERY SPECIFIC about what types of political content work."
-        else:
-            content_type = "sports and college football commentary"
-            context_note = "ALL content is sports-related, so don't mention that sports content works - be VERY SPECIFIC about what types of sports content, teams, players, or topics work."
-
-        prompt = f"""You are analyzing YouTube performance data for {content_type} channels. {context_note}
-
-TOP 10 PERFORMING VIDEOS:
-{top_titles}
-
-BOTTOM 10 PERFORMING VIDEOS:
-{bottom_titles}
-
-HIGHEST ENGAGEMENT VIDEOS:
-{high_engagement_titles}
-
-Provide 5 SPECIFIC insights about content performance. BE EXTREMELY SPECIFIC - mention actual names, events, and topics from the titles above:
-
-1. WINNING TOPICS: What SPECIFIC subjects, people, or events are driving views? (Use actual examples from the titles)
-
-2. LOSING TOPICS: What SPECIFIC subjects or approaches are failing? Look at the bottom performers - what topics/people/events appear there but NOT in top performers?
-
-3. TITLE PATTERNS: Compare successful vs unsuccessful titles. What specific words, phrases, or formats work? (e.g., questions vs statements, name-dropping, specific trigger words)
-
-4. ENGAGEMENT DRIVERS: Which specific topics get high engagement even if views are lower? What controversial subjects or people drive comments?
-
-5. CONTENT GAPS: Based on what's working, what SPECIFIC related topics are missing that could perform well?
-
-DO NOT give generic advice. 
-DO mention specific people's names, specific events, specific controversies from the actual titles.
-Base everything on the actual video titles provided above."""
-
-        response = openai_client.chat.completions.create(
-            model="gpt-4",
-            messages=[{"role": "user", "content": prompt}],
-            max_tokens=700,
-            temperature=0.7
+        progress_bar.empty()
+        fetch_status.update(
+            label=f"Fetched {len(selected_channels) - len(failed_channels)}/{len(selected_channels)} channels",
+            state="error" if failed_channels else "complete"
         )
-        
-        return response.choices[0].message.content
-        
-    except Exception as e:
-        return f"AI analysis temporarily unavailable: {str(e)}"
-    
-# Main content area
-if youtube_api_key and selected_channels:
-    try:
-        # Initialize YouTube API
-        youtube = build('youtube', 'v3', developerKey=youtube_api_key)
-        
-        # Initialize OpenAI if key provided
-        openai_client = None
-        if openai_api_key:
-            openai.api_key = openai_api_key
-            from openai import OpenAI
-            openai_client = OpenAI(api_key=openai_api_key)
-        
-        # Get date range
-        start_date, end_date = get_time_range_dates(time_range)
-        
-        # Use cached function with diagnostic mode
-        with st.spinner("Fetching channel data..."):
-            all_videos = fetch_all_channels_data(selected_channels, start_date, youtube_api_key, CHANNELS)
+        if failed_channels:
+            notices.warning(f"Failed to fetch data for: {', '.join(failed_channels)}")
 
-        if len(all_videos) == 0:
+        if not channel_frames:
             st.warning("No videos fetched. This could be due to:")
             st.write("- API quota exceeded")
             st.write("- No videos in selected time range")
@@ -566,164 +344,29 @@ if youtube_api_key and selected_channels:
             
             if st.button("Clear Cache and Retry"):
                 st.cache_data.clear()
+                clear_video_cache()
                 st.rerun()
 
-        if all_videos:
-            df = pd.DataFrame(all_videos)
-            df['published_at'] = pd.to_datetime(df['published_at'])
+        if channel_frames:
+            # In selection order, so every session with the same selection gets the same shared frame
+            df = combine_channel_frames([channel_frames[name] for name in selected_channels if name in channel_frames])
+            tab1, tab2, tab3, tab_breakouts, tab_stories, tab4 = tabs
+            video_index = get_video_index(df)
             
-            # Overview metrics
-            st.markdown("<div style='margin-bottom: 20px;'></div>", unsafe_allow_html=True)
-
-            col1, col2, col3, col4 = st.columns(4)
-
-            with col1:
-                st.markdown("""
-                    <div class="metric-card" style="min-height: 150px;">
-                        <h3>Total Videos</h3>
-                        <div class="value">{:,}</div>
-                        <div class="change positive">{} Shorts, {} Regular</div>
-                    </div>
-                """.format(
-                    len(df),
-                    len(df[df['is_short']]),
-                    len(df[~df['is_short']])
-                ), unsafe_allow_html=True)
-
-            with col2:
-                total_views = df['views'].sum()
-                st.markdown("""
-                    <div class="metric-card" style="min-height: 150px;">
-                        <h3>Total Views</h3>
-                        <div class="value">{}</div>
-                        <div class="change positive">Avg: {}/video</div>
-                    </div>
-                """.format(
-                    f"{total_views/1_000_000:.1f}M" if total_views >= 1_000_000 else f"{total_views/1_000:.0f}K",
-                    f"{df['views'].mean()/1_000_000:.1f}M" if df['views'].mean() >= 1_000_000 else f"{df['views'].mean()/1_000:.0f}K" if df['views'].mean() >= 1_000 else f"{df['views'].mean():.0f}"
-                ), unsafe_allow_html=True)
-
-            with col3:
-                total_engagement = df['likes'].sum() + df['comments'].sum()
-                st.markdown("""
-                    <div class="metric-card" style="min-height: 150px;">
-                        <h3>Total Engagement</h3>
-                        <div class="value">{}</div>
-                        <div class="change positive">{:.1f}% rate</div>
-                    </div>
-                """.format(
-                    f"{total_engagement/1_000_000:.1f}M" if total_engagement >= 1_000_000 else f"{total_engagement/1_000:.0f}K" if total_engagement >= 1_000 else f"{total_engagement:.0f}",
-                    (total_engagement / total_views * 100) if total_views > 0 else 0
-                ), unsafe_allow_html=True)
-
-            with col4:
-                top_channel = df.groupby('channel')['views'].sum().idxmax()
-                top_channel_views = df.groupby('channel')['views'].sum().max()
-                st.markdown("""
-                    <div class="metric-card" style="min-height: 150px;">
-                        <h3>Top Channel</h3>
-                        <div class="value" style="font-size: 28px; line-height: 1.2;">{}</div>
-                        <div class="change positive">{} views</div>
-                    </div>
-                """.format(
-                    top_channel,
-                    f"{top_channel_views/1_000_000:.1f}M" if top_channel_views >= 1_000_000 else f"{top_channel_views/1_000:.0f}K"
-                ), unsafe_allow_html=True)
-
-            st.markdown("---")
-            
-            # Tabs for different analyses
-            tab1, tab2, tab3, tab4 = st.tabs(["Performance Overview", "Shorts vs Videos", "Top Content", "Strategic Insights"])
+            # Store this fetch as today's observation of its window (once per dataset, not per rerun),
+            # then compare against earlier observations of same-length windows without refetching them
+            daily_store = get_daily_store()
+            daily_store.record(df, fetched_channels, start_date, end_date)
+            week_over_week = period_over_period(daily_store, selected_channels, end_date.date(), 7)
+            day_over_day = period_over_period(daily_store, selected_channels, end_date.date(), 1)
+            # The card's change compares the selected window with the same window a week earlier
+            window_days = (end_date.date() - start_date.date()).days + 1
+            window_vs_last_week = period_over_period(daily_store, selected_channels, end_date.date(), window_days, lag_days=7)
+            with overview_placeholder.container():
+                render_overview_cards(df, window_vs_last_week)
             
             with tab1:
-                st.markdown("### Channel Performance Comparison")
-                
-                # Create a base dataframe with all selected channels
-                all_channels_data = []
-                
-                for channel in selected_channels:
-                    channel_data = df[df['channel'] == channel] if len(df) > 0 else pd.DataFrame()
-                    
-                    if len(channel_data) > 0:
-                        shorts_views = channel_data[channel_data['is_short']]['views'].sum()
-                        regular_views = channel_data[~channel_data['is_short']]['views'].sum()
-                    else:
-                        shorts_views = 0
-                        regular_views = 0
-                    
-                    all_channels_data.append({
-                        'channel': channel,
-                        'Shorts': shorts_views,
-                        'Regular Videos': regular_views,
-                        'Total': shorts_views + regular_views
-                    })
-                
-                # Create DataFrame and sort by total views
-                channel_format_stats = pd.DataFrame(all_channels_data)
-                
                 if not channel_format_stats.empty:
-                    channel_format_stats = channel_format_stats.set_index('channel')
-                    channel_format_stats = channel_format_stats.sort_values('Total', ascending=True)
-                    
-                    # Create stacked bar chart
-                    fig = go.Figure()
-                    
-                    if 'Regular Videos' in channel_format_stats.columns:
-                        fig.add_trace(go.Bar(
-                            y=channel_format_stats.index,
-                            x=channel_format_stats['Regular Videos'],
-                            name='Regular Videos',
-                            orientation='h',
-                            marker_color='#E6DDC1',
-                            text=[f"{val/1_000_000:.1f}M" if val >= 1_000_000 else f"{val/1_000:.0f}K" if val >= 1_000 else "" 
-                                for val in channel_format_stats['Regular Videos']],
-                            textposition='inside',
-                            textfont=dict(color='#221F1F', size=11, family='Inter'),
-                            hovertemplate='%{y}<br>Regular Videos: %{x:,.0f}<extra></extra>'
-                        ))
-                    
-                    if 'Shorts' in channel_format_stats.columns:
-                        fig.add_trace(go.Bar(
-                            y=channel_format_stats.index,
-                            x=channel_format_stats['Shorts'],
-                            name='Shorts',
-                            orientation='h',
-                            marker_color='#BCE5F7',
-                            text=[f"{val/1_000_000:.1f}M" if val >= 1_000_000 else f"{val/1_000:.0f}K" if val >= 1_000 else ""
-                                for val in channel_format_stats['Shorts']],
-                            textposition='inside',
-                            textfont=dict(color='#221F1F', size=11, family='Inter'),
-                            hovertemplate='%{y}<br>Shorts: %{x:,.0f}<extra></extra>'
-                        ))
-                    
-                    fig.update_layout(
-                        title="Total Views by Channel (Shorts vs Regular Videos)",
-                        xaxis_title="Views",
-                        yaxis_title="",
-                        font=dict(family="Inter"),
-                        height=500,
-                        barmode='stack',
-                        showlegend=True,
-                        legend=dict(
-                            orientation="h",
-                            yanchor="bottom",
-                            y=1.02,
-                            xanchor="right",
-                            x=1
-                        ),
-                        xaxis=dict(
-                            tickformat='.2s',
-                            gridcolor='rgba(0,0,0,0.1)'
-                        ),
-                        yaxis=dict(
-                            categoryorder='total ascending'
-                        ),
-                        plot_bgcolor='white',
-                        margin=dict(l=150, r=50, t=80, b=50)
-                    )
-                    
-                    st.plotly_chart(fig, use_container_width=True)
-                    
                     # Add summary stats with error checking
                     col1, col2, col3 = st.columns(3)
                     
@@ -752,6 +395,33 @@ if youtube_api_key and selected_channels:
                             f"by {abs(total_regular - total_shorts)/1_000_000:.1f}M views" if abs(total_regular - total_shorts) >= 1_000_000 else f"by {abs(total_regular - total_shorts)/1_000:.0f}K views"
                         )
                     
+                    # Week-over-week and day-over-day trend per channel and format
+                    st.markdown("---")
+                    st.markdown("### Period over Period")
+                    trend = week_over_week.merge(day_over_day, on=['channel', 'format'], suffixes=('_week', '_day'))
+                    
+                    def format_views(v):
+                        if pd.isna(v):
+                            return "—"
+                        return f"{v/1_000_000:.1f}M" if v >= 1_000_000 else f"{v/1_000:.0f}K" if v >= 1_000 else f"{v:.0f}"
+                    
+                    def format_pct(v):
+                        return "—" if pd.isna(v) else f"{v:+.1f}%"
+                    
+                    st.dataframe(pd.DataFrame({
+                        'Channel': trend['channel'],
+                        'Format': trend['format'],
+                        'Last 7 Days': trend['views_week'].map(format_views),
+                        'Week Before': trend['previous_views_week'].map(format_views),
+                        'WoW': trend['change_pct_week'].map(format_pct),
+                        'Yesterday': trend['views_day'].map(format_views),
+                        'Day Before': trend['previous_views_day'].map(format_views),
+                        'DoD': trend['change_pct_day'].map(format_pct)
+                    }), hide_index=True, use_container_width=True)
+                    st.caption("Each period is compared with the same-length period as it stood 7 days (or 1 day) earlier, "
+                               "so both sides count videos at the same ages. A dash means no refresh covered that earlier "
+                               "period on its day.")
+                    
                     # Add Top 5 Videos and Shorts tables at the bottom
                     st.markdown("---")
                     st.markdown("### Top Performing Content")
@@ -761,7 +431,7 @@ if youtube_api_key and selected_channels:
                     with col1:
                         st.markdown("#### Top 5 Regular Videos")
                         
-                        top_regular = df[~df['is_short']].nlargest(5, 'views')[['title', 'views', 'id', 'channel']]
+                        top_regular = df.iloc[video_index.top(video_index.posting('format', False), 5)][['title', 'views', 'id', 'channel']]
                         
                         if len(top_regular) > 0:
                             for idx, video in top_regular.iterrows():
@@ -793,7 +463,7 @@ if youtube_api_key and selected_channels:
                     with col2:
                         st.markdown("#### Top 5 Shorts")
                         
-                        top_shorts = df[df['is_short']].nlargest(5, 'views')[['title', 'views', 'id', 'channel']]
+                        top_shorts = df.iloc[video_index.top(video_index.posting('format', True), 5)][['title', 'views', 'id', 'channel']]
                         
                         if len(top_shorts) > 0:
                             for idx, video in top_shorts.iterrows():
@@ -831,13 +501,8 @@ if youtube_api_key and selected_channels:
                 
                 with col1:
                     # Regular videos performance
-                    regular_df = df[~df['is_short']]
-                    if len(regular_df) > 0:
-                        regular_by_channel = regular_df.groupby('channel').agg({
-                            'views': ['sum', 'mean', 'count']
-                        }).round(0)
-                        regular_by_channel.columns = ['total_views', 'avg_views', 'video_count']
-                        regular_by_channel = regular_by_channel.sort_values('total_views', ascending=False)
+                    if (~df['is_short']).any():
+                        regular_by_channel = format_breakdown(df, shorts=False)
                         
                         st.markdown("**Regular Videos Overview**")
                         metric_col1, metric_col2 = st.columns(2)
@@ -847,32 +512,7 @@ if youtube_api_key and selected_channels:
                             total_views = regular_by_channel['total_views'].sum()
                             st.metric("Total Views", f"{total_views/1_000_000:.1f}M" if total_views >= 1_000_000 else f"{total_views/1_000:.0f}K")
                         
-                        # Charts for regular videos (same as original)
-                        fig_regular_total = go.Figure()
-                        fig_regular_total.add_trace(go.Bar(
-                            x=regular_by_channel.index,
-                            y=regular_by_channel['total_views'],
-                            marker_color='#E6DDC1',
-                            text=[f"{v/1_000_000:.1f}M" if v >= 1_000_000 else f"{v/1000:.0f}K" if v >= 1000 else f"{v:.0f}" for v in regular_by_channel['total_views']],
-                            textposition='outside',
-                            hovertemplate='%{x}<br>Total Views: %{y:,.0f}<extra></extra>'
-                        ))
-                        
-                        fig_regular_total.update_layout(
-                            title="Total Views - Regular Videos",
-                            xaxis_title="",
-                            yaxis_title="Total Views",
-                            font=dict(family="Inter"),
-                            height=350,
-                            xaxis_tickangle=-45,
-                            yaxis=dict(
-                                gridcolor='rgba(0,0,0,0.1)',
-                                range=[0, regular_by_channel['total_views'].max() * 1.2]
-                            ),
-                            plot_bgcolor='white',
-                            margin=dict(t=50, b=40)
-                        )
-                        st.plotly_chart(fig_regular_total, use_container_width=True)
+                        st.plotly_chart(format_totals_figure(regular_by_channel, shorts=False), use_container_width=True)
                         
                         # Additional charts would go here (avg views, uploads, engagement)
                         
@@ -881,13 +521,8 @@ if youtube_api_key and selected_channels:
                 
                 with col2:
                     # Shorts performance (similar structure)
-                    shorts_df = df[df['is_short']]
-                    if len(shorts_df) > 0:
-                        shorts_by_channel = shorts_df.groupby('channel').agg({
-                            'views': ['sum', 'mean', 'count']
-                        }).round(0)
-                        shorts_by_channel.columns = ['total_views', 'avg_views', 'video_count']
-                        shorts_by_channel = shorts_by_channel.sort_values('total_views', ascending=False)
+                    if df['is_short'].any():
+                        shorts_by_channel = format_breakdown(df, shorts=True)
                         
                         st.markdown("**Shorts Overview**")
                         metric_col1, metric_col2 = st.columns(2)
@@ -897,32 +532,7 @@ if youtube_api_key and selected_channels:
                             total_views = shorts_by_channel['total_views'].sum()
                             st.metric("Total Views", f"{total_views/1_000_000:.1f}M" if total_views >= 1_000_000 else f"{total_views/1_000:.0f}K")
                         
-                        # Charts for shorts
-                        fig_shorts_total = go.Figure()
-                        fig_shorts_total.add_trace(go.Bar(
-                            x=shorts_by_channel.index,
-                            y=shorts_by_channel['total_views'],
-                            marker_color='#BCE5F7',
-                            text=[f"{v/1_000_000:.1f}M" if v >= 1_000_000 else f"{v/1000:.0f}K" if v >= 1000 else f"{v:.0f}" for v in shorts_by_channel['total_views']],
-                            textposition='outside',
-                            hovertemplate='%{x}<br>Total Views: %{y:,.0f}<extra></extra>'
-                        ))
-                        
-                        fig_shorts_total.update_layout(
-                            title="Total Views - Shorts",
-                            xaxis_title="",
-                            yaxis_title="Total Views",
-                            font=dict(family="Inter"),
-                            height=350,
-                            xaxis_tickangle=-45,
-                            yaxis=dict(
-                                gridcolor='rgba(0,0,0,0.1)',
-                                range=[0, shorts_by_channel['total_views'].max() * 1.2]
-                            ),
-                            plot_bgcolor='white',
-                            margin=dict(t=50, b=40)
-                        )
-                        st.plotly_chart(fig_shorts_total, use_container_width=True)
+                        st.plotly_chart(format_totals_figure(shorts_by_channel, shorts=True), use_container_width=True)
                         
                     else:
                         st.info("No Shorts found in selected time range")
@@ -930,8 +540,35 @@ if youtube_api_key and selected_channels:
             with tab3:
                 st.markdown("### Top Performing Content")
                 
+                # Filters resolve against the precomputed index, so changing one does not rescan df
+                filter_cols = st.columns([1.2, 2, 1.6, 2, 1.2])
+                with filter_cols[0]:
+                    format_filter = st.selectbox("Format", ["All", "Videos", "Shorts"])
+                with filter_cols[1]:
+                    day_filter = st.multiselect("Published", [d.isoformat() for d in video_index.days],
+                                                format_func=lambda d: datetime.fromisoformat(d).strftime('%a %m/%d'))
+                with filter_cols[2]:
+                    hour_filter = st.slider("Hour", 0, 23, (0, 23), help="Publish hour in server local time, like the date range")
+                with filter_cols[3]:
+                    duration_filter = st.multiselect("Duration", [label for label, _, _ in DURATION_BUCKETS])
+                with filter_cols[4]:
+                    min_views = st.number_input("Min views", min_value=0, value=0, step=10_000)
+                
+                matches = video_index.select(
+                    shorts={"All": None, "Videos": False, "Shorts": True}[format_filter],
+                    days=[datetime.fromisoformat(d).date() for d in day_filter] if day_filter else None,
+                    hours=hour_filter,
+                    durations=duration_filter or None,
+                    min_views=int(min_views)
+                )
+                match_counts = video_index.counts(matches)
+                st.caption(f"{match_counts['videos']:,} of {len(df):,} videos match "
+                           f"({match_counts['shorts']:,} Shorts, {match_counts['regular']:,} regular)")
+                
                 # Top videos table with thumbnails
-                top_videos = df.nlargest(10, 'views')[['channel', 'title', 'views', 'likes', 'comments', 'is_short', 'published_at', 'id']]
+                top_videos = df.iloc[video_index.top(matches, 10)][['channel', 'title', 'views', 'likes', 'comments', 'is_short', 'published_at', 'id']]
+                if len(top_videos) == 0:
+                    st.info("No videos match these filters")
                 
                 # Add header row
                 header_cols = st.columns([1.5, 2, 4, 1.2, 1.2, 1.2, 1, 1.2])
@@ -999,12 +636,93 @@ if youtube_api_key and selected_channels:
                     
                     st.markdown("---")
                             
+            with tab_breakouts:
+                st.markdown("### Breakouts")
+                st.caption("Videos ranked by how far they beat their own channel's typical views for the same format "
+                           "at the same age (robust z-score of age-adjusted log views against the median and MAD of "
+                           "the channel's recent videos).")
+                channel_baselines = get_channel_baselines()
+                channel_baselines.update(df)
+                breakouts = channel_baselines.top(df, 15)
+                
+                if len(breakouts) > 0:
+                    st.dataframe(pd.DataFrame({
+                        'Channel': breakouts['channel'],
+                        'Title': breakouts['title'],
+                        'Format': np.where(breakouts['is_short'], 'Short', 'Video'),
+                        'Views': breakouts['views'],
+                        'Typical at This Age': breakouts['baseline_views'].round().astype(int),
+                        'vs Typical': breakouts['views_multiple'].map(lambda r: f"{r:.1f}x"),
+                        'Score': breakouts['breakout_score'].round(1),
+                        'Published': breakouts['published_at'].dt.strftime('%m/%d/%Y')
+                    }), hide_index=True, use_container_width=True)
+                else:
+                    st.info("Not enough videos per channel and format yet to set baselines.")
+                            
+            with tab_stories:
+                st.markdown("### Stories Covered by Several Channels")
+                title_index = get_title_index()
+                title_index.add(df['id'], df['title'])
+                threshold = st.slider("Title similarity", 0.3, 0.8, 0.45, 0.05,
+                                      help="Minimum cosine similarity of TF-IDF title vectors for two videos to share a story")
+                stories = df[['id', 'channel', 'title', 'views', 'is_short', 'published_at']].assign(
+                    story=title_clusters(title_index, tuple(df['id']), title_index.version, threshold),
+                    vs_median=df['views'] / df.groupby('channel')['views'].transform('median').clip(lower=1)
+                )
+                # Name each story after its most viewed video so the selection survives reruns
+                lead = stories.sort_values('views', ascending=False).drop_duplicates('story').set_index('story')
+                stories['story'] = stories['story'].map(lead['id'])
+                story_stats = stories.groupby('story').agg(
+                    channels=('channel', 'nunique'), videos=('id', 'size'), views=('views', 'sum')
+                )
+                story_stats = story_stats[story_stats['channels'] >= 2].sort_values(['channels', 'views'], ascending=False)
+                story_stats['title'] = stories.set_index('id')['title'].reindex(story_stats.index)
+                story_labels = {
+                    story: f"{row.title[:80]} ({row.channels} channels)" for story, row in story_stats.head(50).iterrows()
+                }
+                
+                if len(story_stats) > 0:
+                    st.dataframe(pd.DataFrame({
+                        'Story (most viewed title)': story_stats['title'],
+                        'Channels': story_stats['channels'],
+                        'Videos': story_stats['videos'],
+                        'Total Views': story_stats['views'].map(lambda v: f"{v/1_000_000:.1f}M" if v >= 1_000_000 else f"{v/1_000:.0f}K")
+                    }), hide_index=True, use_container_width=True)
+                    
+                    picked = st.selectbox(
+                        "Compare versions of a story", list(story_labels),
+                        format_func=lambda story: story_labels.get(story, story)
+                    )
+                    versions = stories[stories['story'] == picked].sort_values('views', ascending=False)
+                    st.dataframe(pd.DataFrame({
+                        'Channel': versions['channel'],
+                        'Title': versions['title'],
+                        'Views': versions['views'],
+                        'vs Channel Median': versions['vs_median'].map(lambda r: f"{r:.1f}x"),
+                        'Format': np.where(versions['is_short'], 'Short', 'Video'),
+                        'Published': versions['published_at'].dt.strftime('%m/%d/%Y')
+                    }), hide_index=True, use_container_width=True)
+                else:
+                    st.info("No story was covered by more than one channel at this similarity.")
+                
+                # Free-text lookup against the same index
+                query = st.text_input("Find similar titles", placeholder="e.g. border crisis")
+                if query:
+                    rows, scores = title_index.similar(query, rows=title_index.rows_for(df['id']))
+                    matches = df.set_index('id').loc[[title_index.ids[row] for row in rows]]
+                    st.dataframe(pd.DataFrame({
+                        'Channel': matches['channel'],
+                        'Title': matches['title'],
+                        'Views': matches['views'],
+                        'Similarity': scores.round(2)
+                    }), hide_index=True, use_container_width=True)
+                            
             with tab4:
                 st.markdown("### Strategic Insights")
                 
-                if openai_client:
+                if openai_api_key:
                     with st.spinner("Generating Strategic Insights..."):
-                        insights = generate_ai_insights(df, openai_client, dashboard_focus)
+                        insights, llm_result = generate_ai_insights(df, get_llm_caller(openai_api_key), dashboard_focus)
                         
                         st.markdown(f"""
                             <div class="ai-analysis">
@@ -1012,6 +730,12 @@ if youtube_api_key and selected_channels:
                                 {insights.replace(chr(10), '<br>')}
                             </div>
                         """, unsafe_allow_html=True)
+                        if llm_result:
+                            st.caption(
+                                f"{llm_result.model}{' (fallback)' if llm_result.fell_back else ''} · "
+                                f"{llm_result.latency_s:.1f}s · {llm_result.prompt_tokens:,} prompt + "
+                                f"{llm_result.completion_tokens:,} completion tokens · ~${llm_result.cost_usd:.3f}"
+                            )
                         
                 else:
                     st.info("Add your OpenAI API key to enable Strategic Insights")
@@ -1049,10 +773,7 @@ else:
 
 # Footer
 st.markdown("---")
-if dashboard_type == "Ben Shapiro (Political)":
-    footer_text = "Shorthand Studios | Daily Wire Competitor Dashboard"
-else:
-    footer_text = "Crain & Company | Sports Content Analytics Dashboard"
+footer_text = dashboard['footer']
 
 st.markdown(f"""
     <div style="text-align: center; color: #666; font-family: Inter; font-size: 14px; padding: 2rem 0;">
@@ -0,0 +1,276 @@
+"""Shared data service for dashboard replicas
+
+    python data_service.py [--host 127.0.0.1] [--port 8502]
+
+Owns all YouTube fetching and caching. Any number of Streamlit replicas started with
+DATA_SERVICE_URL=http://<host>:8502 read from it and make no YouTube calls of their
+own, so API cost stays the same however many replicas run. Replicas keep each /videos
+result for REMOTE_VIDEOS_TTL seconds, so widget reruns stay local.
+
+Endpoints:
+    GET  /registry                        dashboards, channel metadata and registry problems
+    GET  /videos?dashboard=&channel=...&time_range=
+                                          JSON lines, one per channel as soon as it is fetched, each with
+                                          the token of the cached dataset behind it
+                                          (format=arrow returns one Arrow IPC stream; needs pyarrow)
+    GET  /aggregates?dashboard=&channel=...&time_range=
+                                          overview totals and per-channel Shorts/Regular views
+    GET  /report?dashboard=               today's static report snapshot (built on the first request)
+    POST /refresh                         drop cached video data and today's reports so the next request refetches
+                                          (needs "Authorization: Bearer $DATA_SERVICE_TOKEN"; loopback only without a token)
+
+Errors come back as JSON {"error": ...}: 400 for bad queries, 502 when YouTube fails,
+500 otherwise. The service binds to loopback by default; when replicas reach it over a
+network (--host 0.0.0.0), set DATA_SERVICE_TOKEN on the service and on every replica.
+"""
+import argparse
+import hmac
+import io
+import json
+import os
+import time
+import urllib.parse
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, List, Tuple
+import pandas as pd
+from googleapiclient.errors import HttpError
+
+from youtube_data import (
+    CHANNEL_REGISTRY_PATH, get_key_ring, load_channel_registry, get_time_range_dates, clear_video_cache, get_video_cache,
+    stream_channels_data, combine_channel_frames, videos_frame, overview_totals, channel_format_totals
+)
+from report_snapshot import ensure_snapshot, invalidate_snapshots
+
+# Shared secret for POST /refresh; replicas send the same value
+DATA_SERVICE_TOKEN = os.getenv('DATA_SERVICE_TOKEN', '')
+# How long a replica reuses a /videos result before asking the service again
+REMOTE_VIDEOS_TTL = int(os.getenv('REMOTE_VIDEOS_TTL', '120'))
+
+
+# Server side
+def current_registry() -> Tuple[List[Dict], Dict[str, Dict], List[str]]:
+    return load_channel_registry(
+        CHANNEL_REGISTRY_PATH, os.path.getmtime(CHANNEL_REGISTRY_PATH), get_key_ring().current()
+    )
+
+
+def stream_request(query: Dict[str, List[str]]) -> Iterator[Tuple[str, pd.DataFrame, Tuple[str, str]]]:
+    """Channel results for a /videos or /aggregates query, as they complete"""
+    dashboards, channel_metadata, _ = current_registry()
+    dashboard_key = query.get('dashboard', [''])[0]
+    dashboard = next((d for d in dashboards if d['key'] == dashboard_key), None)
+    if dashboard is None:
+        raise KeyError(f"unknown dashboard {dashboard_key!r}")
+    channels = [name for name in query.get('channel', []) if name in dashboard['channels']]
+    start_date, _ = get_time_range_dates(query.get('time_range', ['Last 7 Days'])[0])
+    return stream_channels_data(
+        channels, start_date, get_key_ring().current(), dashboard['channels'], channel_metadata
+    )
+
+
+class DataServiceHandler(BaseHTTPRequestHandler):
+    def _send_json(self, payload, status: int = 200):
+        body = json.dumps(payload, default=str).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_response(self, code, message=None):
+        self._response_started = True
+        super().send_response(code, message)
+
+    def _send_error(self, error: Exception):
+        if isinstance(error, KeyError):
+            status, message = 400, error.args[0]
+        elif isinstance(error, HttpError):
+            status, message = 502, f"YouTube API error: {error}"
+        else:
+            status, message = 500, f"{type(error).__name__}: {error}"
+        if self._response_started:
+            # Mid-stream the status line is already out; closing the connection is all we can do
+            self.log_error("failed after response started: %s", message)
+            self.close_connection = True
+        else:
+            self._send_json({'error': message}, status)
+
+    def do_GET(self):
+        self._response_started = False
+        url = urllib.parse.urlsplit(self.path)
+        query = urllib.parse.parse_qs(url.query)
+        try:
+            if url.path == '/registry':
+                dashboards, channel_metadata, problems = current_registry()
+                self._send_json({'dashboards': dashboards, 'channel_metadata': channel_metadata, 'problems': problems})
+            elif url.path == '/videos' and query.get('format', ['json'])[0] == 'arrow':
+                self._send_arrow(stream_request(query))
+            elif url.path == '/videos':
+                self._send_json_lines(stream_request(query))
+            elif url.path == '/aggregates':
+                self._send_aggregates(query, stream_request(query))
+            elif url.path == '/report':
+                self._send_report(query)
+            else:
+                self._send_json({'error': 'not found'}, 404)
+        except Exception as e:
+            self._send_error(e)
+
+    def _authorized(self) -> bool:
+        if DATA_SERVICE_TOKEN:
+            return hmac.compare_digest(self.headers.get('Authorization', ''), f"Bearer {DATA_SERVICE_TOKEN}")
+        return self.client_address[0] in ('127.0.0.1', '::1')
+
+    def do_POST(self):
+        self._response_started = False
+        if urllib.parse.urlsplit(self.path).path != '/refresh':
+            self._send_json({'error': 'not found'}, 404)
+        elif not self._authorized():
+            # Refresh drops every cache and report, forcing refetches and new insight spend
+            self._send_json({'error': 'refresh needs the data service token'}, 403)
+        else:
+            try:
+                clear_video_cache()
+                invalidate_snapshots()
+                self._send_json({'status': 'ok'})
+            except Exception as e:
+                self._send_error(e)
+
+    def _send_report(self, query):
+        dashboards, channel_metadata, _ = current_registry()
+        dashboard_key = query.get('dashboard', [''])[0]
+        dashboard = next((d for d in dashboards if d['key'] == dashboard_key), None)
+        if dashboard is None:
+            raise KeyError(f"unknown dashboard {dashboard_key!r}")
+        # Only the first request of a cycle pays for the build; the rest read the file
+        path = ensure_snapshot(dashboard, channel_metadata, get_key_ring().current(), os.getenv('OPENAI_API_KEY') or None)
+        with open(path, 'rb') as f:
+            body = f.read()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json_lines(self, channel_stream):
+        # No Content-Length: the body streams one line per channel and ends when the connection closes
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson')
+        self.end_headers()
+        for channel_name, frame, failure in channel_stream:
+            line = json.dumps({
+                'channel': channel_name, 'videos': frame.to_dict('records'), 'failure': failure,
+                # Names the cached dataset behind the rows, so replicas can reuse work built on it
+                'token': frame.attrs.get('cache_token')
+            }, default=str)
+            self.wfile.write(line.encode() + b'\n')
+            self.wfile.flush()
+
+    def _send_arrow(self, channel_stream):
+        try:
+            import pyarrow as pa
+        except ImportError:
+            self._send_json({'error': 'format=arrow needs pyarrow installed on the data service'}, 501)
+            return
+        frames, failures = [], []
+        for channel_name, frame, failure in channel_stream:
+            frames.append(frame)
+            if failure:
+                failures.append([channel_name, *failure])
+        combined = combine_channel_frames(frames)
+        table = pa.Table.from_pandas(combined, preserve_index=False)
+        sink = io.BytesIO()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        body = sink.getvalue()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/vnd.apache.arrow.stream')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('X-Failed-Channels', json.dumps(failures))
+        self.send_header('X-Dataset-Token', json.dumps(combined.attrs.get('cache_token')))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_aggregates(self, query, channel_stream):
+        frames, failures = [], []
+        for channel_name, frame, failure in channel_stream:
+            frames.append(frame)
+            if failure:
+                failures.append([channel_name, *failure])
+        df = combine_channel_frames(frames)
+        channels = query.get('channel', [])
+        self._send_json({
+            'overview': overview_totals(df) if len(df) > 0 else None,
+            'channel_format_totals': channel_format_totals(df, channels).to_dict('records'),
+            'failures': failures
+        })
+
+
+# Client side, used by dash.py when DATA_SERVICE_URL is set
+def remote_registry(base_url: str) -> Tuple[List[Dict], Dict[str, Dict], List[str]]:
+    with urllib.request.urlopen(f"{base_url.rstrip('/')}/registry", timeout=60) as response:
+        payload = json.load(response)
+    return payload['dashboards'], payload['channel_metadata'], payload['problems']
+
+
+def remote_stream_channels(base_url: str, dashboard_key: str, channel_list: List[str],
+                           time_range: str) -> Iterator[Tuple[str, pd.DataFrame, Tuple[str, str]]]:
+    """Same (channel_name, videos, failure) stream as stream_channels_data, served by the data service
+
+    A complete, failure-free result is kept in the replica's video cache for
+    REMOTE_VIDEOS_TTL seconds, so widget reruns do not download every row again.
+    """
+    key = ('remote', base_url, dashboard_key, tuple(channel_list), time_range)
+    cached = get_video_cache().get(key)
+    if cached is not None:
+        yield from cached
+        return
+
+    query = urllib.parse.urlencode(
+        [('dashboard', dashboard_key), ('time_range', time_range)] + [('channel', name) for name in channel_list]
+    )
+    results = []
+    with urllib.request.urlopen(f"{base_url.rstrip('/')}/videos?{query}", timeout=600) as response:
+        for line in response:
+            if line.strip():
+                result = json.loads(line)
+                frame = videos_frame(result['videos'])
+                # The service's token stays the same while it serves the same cached dataset, so the
+                # filter index and baselines built on it survive this cache expiring
+                frame.attrs['cache_token'] = f"remote:{result.get('token') or time.monotonic_ns()}"
+                results.append((result['channel'], frame, tuple(result['failure']) if result['failure'] else None))
+                yield results[-1]
+    if not any(failure for _, _, failure in results):
+        get_video_cache().put(key, results, ttl=REMOTE_VIDEOS_TTL,
+                              label=f"{dashboard_key}, {len(results)} channels from the data service")
+
+
+def remote_report(base_url: str, dashboard_key: str) -> bytes:
+    """Today's report snapshot for a dashboard, fetched by the replica so browsers never reach the service"""
+    query = urllib.parse.urlencode({'dashboard': dashboard_key})
+    with urllib.request.urlopen(f"{base_url.rstrip('/')}/report?{query}", timeout=600) as response:
+        return response.read()
+
+
+def remote_refresh(base_url: str):
+    headers = {'Authorization': f"Bearer {DATA_SERVICE_TOKEN}"} if DATA_SERVICE_TOKEN else {}
+    request = urllib.request.Request(f"{base_url.rstrip('/')}/refresh", method='POST', headers=headers)
+    urllib.request.urlopen(request, timeout=60).close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shared YouTube data service for dashboard replicas")
+    parser.add_argument('--host', default=os.getenv('DATA_SERVICE_HOST', '127.0.0.1'))
+    parser.add_argument('--port', type=int, default=int(os.getenv('DATA_SERVICE_PORT', '8502')))
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer((args.host, args.port), DataServiceHandler)
+    print(f"Data service listening on http://{args.host}:{args.port}")
+    if not DATA_SERVICE_TOKEN and args.host not in ('127.0.0.1', 'localhost', '::1'):
+        print("DATA_SERVICE_TOKEN is not set: POST /refresh only accepts loopback clients")
+    server.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
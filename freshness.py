@@ -0,0 +1,129 @@
+"""Tiered refresh schedule for video statistics
+
+New uploads gain views fastest, so how often a video's statistics are refetched depends
+on its age:
+
+    under 24 hours   every 15 minutes
+    1 - 3 days       hourly
+    older            every 6 hours
+
+Videos on an active channel (ACTIVE_UPLOADS_PER_DAY or more uploads per day over the last
+ACTIVITY_WINDOW) move one tier hotter. The rate comes from each channel's upload history
+across every listing, divided by the span those listings actually covered, so a channel
+gets the same tier whichever time range was fetched. Only videos whose tier is due go into videos.list batches, so a channel
+check usually costs its playlist page plus a batch or two for the newest uploads.
+"""
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+# (age below which the tier applies, refresh interval), hottest first; the last tier catches the rest
+FRESHNESS_TIERS = [
+    (timedelta(hours=24), timedelta(minutes=15)),
+    (timedelta(days=3), timedelta(hours=1)),
+    (timedelta.max, timedelta(hours=6)),
+]
+ACTIVE_UPLOADS_PER_DAY = 3.0
+ACTIVITY_WINDOW = timedelta(days=3)
+# Statistics for videos published before this are no longer shown and are dropped
+RETAIN_FOR = timedelta(days=10)
+
+
+def parse_published(published_at: str) -> datetime:
+    return datetime.fromisoformat(published_at.replace('Z', '+00:00'))
+
+
+class FreshnessScheduler:
+    """Latest statistics per video and when each is next due, shared by every session"""
+
+    def __init__(self, tiers=FRESHNESS_TIERS, active_uploads_per_day: float = ACTIVE_UPLOADS_PER_DAY):
+        self.tiers = tiers
+        self.active_uploads_per_day = active_uploads_per_day
+        self._statistics: Dict[str, Dict] = {}
+        self._refreshed_at: Dict[str, datetime] = {}
+        self._published: Dict[str, datetime] = {}
+        # channel -> {video id: published} from every listing, and the earliest time a listing covered
+        self._uploads: Dict[str, Dict[str, datetime]] = {}
+        self._listed_since: Dict[str, datetime] = {}
+        self._lock = threading.Lock()
+        self.refreshed = 0
+        self.skipped = 0
+
+    def observe(self, channel: str, published: Dict[str, datetime], listed_since: datetime):
+        """Add a channel listing's {video ID: publish time} (covering listed_since to now) to its history"""
+        with self._lock:
+            self._uploads.setdefault(channel, {}).update(published)
+            self._listed_since[channel] = min(self._listed_since.get(channel, listed_since), listed_since)
+
+    def is_active(self, channel: str, now: datetime) -> bool:
+        """Whether the channel's uploads per day over ACTIVITY_WINDOW (or as much of it as its
+        listings have covered, at least a day) reach the active rate"""
+        with self._lock:
+            since = self._listed_since.get(channel)
+            if since is None:
+                return False
+            span = min(ACTIVITY_WINDOW, max(now - since, timedelta(days=1)))
+            recent = sum(1 for p in self._uploads[channel].values() if now - p <= span)
+        return recent / (span / timedelta(days=1)) >= self.active_uploads_per_day
+
+    def interval(self, published: datetime, now: datetime, active: bool = False) -> timedelta:
+        tier = next(i for i, (max_age, _) in enumerate(self.tiers) if now - published < max_age)
+        return self.tiers[max(tier - 1, 0) if active else tier][1]
+
+    def due(self, channel: str, published_by_id: Dict[str, Optional[datetime]], listed_since: datetime,
+            now: datetime = None) -> List[str]:
+        """IDs whose statistics are missing or older than their tier's interval (unknown publish times are due)
+
+        published_by_id is one listing of channel, covering listed_since to now.
+        """
+        now = now or datetime.now(timezone.utc)
+        self.observe(channel, {v: p for v, p in published_by_id.items() if p}, listed_since)
+        active = self.is_active(channel, now)
+        due = []
+        with self._lock:
+            self._forget_old(now)
+            for video_id, published in published_by_id.items():
+                if published is not None:
+                    self._published[video_id] = published
+                refreshed_at = self._refreshed_at.get(video_id)
+                if (published is None or refreshed_at is None
+                        or now - refreshed_at >= self.interval(published, now, active)):
+                    due.append(video_id)
+            self.skipped += len(published_by_id) - len(due)
+        return due
+
+    def record(self, video_id: str, statistics: Dict, now: datetime = None):
+        with self._lock:
+            self._statistics[video_id] = statistics
+            self._refreshed_at[video_id] = now or datetime.now(timezone.utc)
+            self.refreshed += 1
+
+    def statistics(self, video_id: str) -> Optional[Dict]:
+        with self._lock:
+            return self._statistics.get(video_id)
+
+    def next_check(self, channel: str, published: List[datetime], now: datetime = None) -> timedelta:
+        """How long until a channel with these uploads should be checked again"""
+        now = now or datetime.now(timezone.utc)
+        if not published:
+            return self.tiers[1][1]
+        active = self.is_active(channel, now)
+        return min(self.interval(p, now, active) for p in published)
+
+    def _forget_old(self, now: datetime):
+        # Statistics for videos too old to be in any time range are never read again
+        for video_id in [v for v, p in self._published.items() if now - p > RETAIN_FOR]:
+            self._statistics.pop(video_id, None)
+            self._refreshed_at.pop(video_id, None)
+            del self._published[video_id]
+        for uploads in self._uploads.values():
+            for video_id in [v for v, p in uploads.items() if now - p > RETAIN_FOR]:
+                del uploads[video_id]
+
+    def clear(self):
+        with self._lock:
+            self._statistics.clear()
+            self._refreshed_at.clear()
+            self._published.clear()
+            self._uploads.clear()
+            self._listed_since.clear()
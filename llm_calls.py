@@ -0,0 +1,234 @@
+"""Deadline-, budget- and cost-aware OpenAI chat calls for Strategic Insights
+
+LLMCaller wraps any client exposing chat.completions.create (the OpenAI SDK or a local
+fake). Each call:
+
+- runs against a deadline; the primary model gets part of it and the fallback model
+  the rest, and the primary is skipped for an hour after it times out or answers too slowly
+- is refused up front when its worst-case cost would break the daily budget, falling
+  back to the cheaper model when that one still fits
+- is recorded to SQLite with model, prompt/completion tokens, latency, estimated cost
+  and outcome, so spend survives restarts and is shared by every session and replica
+  on the same disk
+"""
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional
+import streamlit as st
+
+from youtube_data import APP_DIR
+
+LLM_MODEL = os.getenv('OPENAI_MODEL', 'gpt-4')
+LLM_FALLBACK_MODEL = os.getenv('OPENAI_FALLBACK_MODEL', 'gpt-4o-mini')
+LLM_DEADLINE_SECONDS = float(os.getenv('OPENAI_DEADLINE_SECONDS', '45'))
+LLM_DAILY_BUDGET_USD = float(os.getenv('OPENAI_DAILY_BUDGET_USD', '5'))
+LLM_USAGE_PATH = os.getenv('LLM_USAGE_DB', os.path.join(APP_DIR, '.llm_usage.sqlite'))
+
+# USD per 1K tokens (prompt, completion); unknown models are priced as gpt-4 to stay conservative
+MODEL_PRICES = {
+    'gpt-4': (0.03, 0.06),
+    'gpt-4-turbo': (0.01, 0.03),
+    'gpt-4o': (0.0025, 0.01),
+    'gpt-4o-mini': (0.00015, 0.0006),
+    'gpt-3.5-turbo': (0.0005, 0.0015),
+}
+
+# Share of the deadline the primary model may use before the fallback takes over
+PRIMARY_DEADLINE_SHARE = 0.6
+# How far back latency history decides whether to skip the primary; once it ages out the primary is tried again
+LATENCY_LOOKBACK = timedelta(hours=1)
+
+
+class BudgetExceeded(Exception):
+    """The daily LLM budget does not cover this call on any configured model"""
+
+
+class DeadlineExceeded(Exception):
+    """No model answered before the deadline"""
+
+
+@dataclass
+class LLMResult:
+    text: str
+    model: str
+    prompt_tokens: int
+    completion_tokens: int
+    latency_s: float
+    cost_usd: float
+    fell_back: bool
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    prompt_price, completion_price = MODEL_PRICES.get(model, MODEL_PRICES['gpt-4'])
+    return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1000
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token) for budgeting before a call"""
+    return len(text) // 4 + 1
+
+
+def is_timeout(error: Exception) -> bool:
+    # openai.APITimeoutError, httpx timeouts and the builtin all carry "Timeout" in the name
+    return isinstance(error, (TimeoutError, FutureTimeout)) or 'Timeout' in type(error).__name__
+
+
+def run_call(future: Future, create: Callable, **kwargs):
+    """Resolve future with create(**kwargs), unless it was cancelled before starting"""
+    if not future.set_running_or_notify_cancel():
+        return
+    try:
+        future.set_result(create(**kwargs))
+    except BaseException as e:
+        future.set_exception(e)
+
+
+class LLMUsageLog:
+    """One row per LLM call attempt in SQLite, with spend and latency queries"""
+
+    def __init__(self, path: str):
+        self._path = path
+        self._lock = threading.Lock()
+        with self._connect() as db:
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS calls (
+                    at TEXT, day TEXT, model TEXT, prompt_tokens INTEGER, completion_tokens INTEGER,
+                    latency_s REAL, cost_usd REAL, outcome TEXT
+                )
+            """)
+
+    def _connect(self):
+        return sqlite3.connect(self._path, timeout=30)
+
+    def record(self, model: str, prompt_tokens: int, completion_tokens: int, latency_s: float,
+               cost_usd: float, outcome: str, now: datetime = None):
+        now = now or datetime.now()
+        with self._lock, self._connect() as db:
+            db.execute("INSERT INTO calls VALUES (?, ?, ?, ?, ?, ?, ?, ?)", (
+                now.isoformat(timespec='seconds'), now.strftime('%Y-%m-%d'), model,
+                prompt_tokens, completion_tokens, latency_s, cost_usd, outcome
+            ))
+
+    def spent(self, day: str) -> float:
+        with self._connect() as db:
+            return db.execute("SELECT COALESCE(SUM(cost_usd), 0) FROM calls WHERE day = ?", (day,)).fetchone()[0]
+
+    def recent_latency(self, model: str, since: datetime, calls: int = 10) -> Optional[float]:
+        """Slowest of the model's last calls since `since`, None when it has none
+
+        A timeout never finished, so it counts as infinitely slow; without that, a model
+        that keeps timing out would never update its estimate.
+        """
+        with self._connect() as db:
+            rows = db.execute(
+                "SELECT latency_s, outcome FROM calls WHERE model = ? AND outcome IN ('ok', 'timeout') AND at >= ? "
+                "ORDER BY rowid DESC LIMIT ?",
+                (model, since.isoformat(timespec='seconds'), calls)
+            ).fetchall()
+        return max(float('inf') if outcome == 'timeout' else latency for latency, outcome in rows) if rows else None
+
+    def day_summary(self, day: str) -> Dict:
+        with self._connect() as db:
+            calls, tokens, cost, failures = db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(prompt_tokens + completion_tokens), 0), COALESCE(SUM(cost_usd), 0), "
+                "COALESCE(SUM(outcome != 'ok'), 0) FROM calls WHERE day = ?", (day,)
+            ).fetchone()
+        return {'calls': calls, 'tokens': tokens, 'cost_usd': cost, 'failures': failures}
+
+
+@st.cache_resource
+def get_llm_usage_log() -> LLMUsageLog:
+    return LLMUsageLog(LLM_USAGE_PATH)
+
+
+class LLMCaller:
+    """Chat completions with a deadline, a fallback model and a daily budget"""
+
+    def __init__(self, client, usage_log: LLMUsageLog, model: str = LLM_MODEL,
+                 fallback_model: Optional[str] = LLM_FALLBACK_MODEL, deadline_s: float = LLM_DEADLINE_SECONDS,
+                 daily_budget_usd: float = LLM_DAILY_BUDGET_USD, clock: Callable[[], datetime] = datetime.now):
+        self.client = client
+        self.usage_log = usage_log
+        self.model = model
+        self.fallback_model = fallback_model if fallback_model and fallback_model != model else None
+        self.deadline_s = deadline_s
+        self.daily_budget_usd = daily_budget_usd
+        self.clock = clock
+
+    def remaining_budget(self) -> float:
+        return self.daily_budget_usd - self.usage_log.spent(self.clock().strftime('%Y-%m-%d'))
+
+    def complete(self, prompt: str, max_tokens: int = 700, temperature: float = 0.7) -> LLMResult:
+        """Answer prompt within the deadline and budget, or raise BudgetExceeded / DeadlineExceeded"""
+        started = time.monotonic()
+        worst_case = {
+            model: estimate_cost(model, estimate_tokens(prompt), max_tokens)
+            for model in filter(None, [self.model, self.fallback_model])
+        }
+        remaining_budget = self.remaining_budget()
+        affordable = [model for model, cost in worst_case.items() if cost <= remaining_budget]
+        if not affordable:
+            raise BudgetExceeded(
+                f"daily LLM budget ${self.daily_budget_usd:.2f} reached "
+                f"(${max(remaining_budget, 0):.2f} left, call needs up to ${min(worst_case.values()):.3f})"
+            )
+
+        plan = affordable
+        primary_window = self.deadline_s * (PRIMARY_DEADLINE_SHARE if len(plan) > 1 else 1)
+        expected = self.usage_log.recent_latency(plan[0], self.clock() - LATENCY_LOOKBACK)
+        if len(plan) > 1 and expected is not None and expected > primary_window:
+            # The primary has recently been too slow, or timed out, within its share of the deadline
+            plan = plan[1:]
+            primary_window = self.deadline_s
+
+        last_error = None
+        for attempt, model in enumerate(plan):
+            elapsed = time.monotonic() - started
+            window = primary_window if attempt == 0 else self.deadline_s - elapsed
+            if window <= 0:
+                break
+            try:
+                return self._call(model, prompt, max_tokens, temperature, window, fell_back=model != self.model)
+            except Exception as e:
+                last_error = e
+                if not is_timeout(e):
+                    raise
+        raise DeadlineExceeded(f"no answer within {self.deadline_s:g}s") from last_error
+
+    def _call(self, model: str, prompt: str, max_tokens: int, temperature: float, timeout: float,
+              fell_back: bool) -> LLMResult:
+        client = self.client.with_options(timeout=timeout, max_retries=0) if hasattr(self.client, 'with_options') else self.client
+        prompt_estimate = estimate_tokens(prompt)
+        started = time.monotonic()
+        future = Future()
+        # Each call gets its own daemon thread, so the deadline holds even when a client ignores its
+        # timeout, and a hung call never leaves later ones queued behind it the way a pool would
+        threading.Thread(
+            target=run_call, name=f'llm-{model}', daemon=True, args=(future, client.chat.completions.create),
+            kwargs=dict(model=model, messages=[{"role": "user", "content": prompt}],
+                        max_tokens=max_tokens, temperature=temperature)
+        ).start()
+        try:
+            response = future.result(timeout=timeout)
+        except Exception as e:
+            latency = time.monotonic() - started
+            # cancel() only succeeds when the request never started; one that did may still be billed
+            sent = not future.cancel()
+            self.usage_log.record(model, prompt_estimate if sent else 0, 0, latency,
+                                  estimate_cost(model, prompt_estimate, 0) if sent else 0,
+                                  'timeout' if is_timeout(e) else 'error', self.clock())
+            raise
+        latency = time.monotonic() - started
+
+        usage = getattr(response, 'usage', None)
+        prompt_tokens = getattr(usage, 'prompt_tokens', None) or prompt_estimate
+        text = response.choices[0].message.content or ''
+        completion_tokens = getattr(usage, 'completion_tokens', None) or estimate_tokens(text)
+        cost = estimate_cost(model, prompt_tokens, completion_tokens)
+        self.usage_log.record(model, prompt_tokens, completion_tokens, latency, cost, 'ok', self.clock())
+        return LLMResult(text, model, prompt_tokens, completion_tokens, latency, cost, fell_back)
@@ -0,0 +1,194 @@
+"""Static executive report snapshots
+
+    python report_snapshot.py [--dashboard political] [--time-range "Last 7 Days"] [--no-insights]
+
+Renders a dashboard's default channels - overview cards, the Shorts vs Regular charts,
+the top content tables and Strategic Insights - into one self-contained HTML file
+(stylesheet and plotly.js inline). Run it once per refresh cycle, e.g. from cron after
+the daily data lands; the dashboard sidebar and the data service's /report endpoint then
+hand out that file with no YouTube or OpenAI calls per view.
+
+Snapshots are written to REPORTS_DIR as <dashboard>-<YYYY-MM-DD>.html, plus
+<dashboard>-latest.html pointing at the newest one.
+"""
+import argparse
+import html
+import os
+import shutil
+import threading
+from datetime import date, datetime
+from typing import Dict, List, Optional
+import pandas as pd
+
+from youtube_data import (
+    APP_DIR, CHANNEL_REGISTRY_PATH, get_key_ring, load_channel_registry, get_time_range_dates,
+    stream_channels_data, combine_channel_frames, get_daily_store, period_over_period
+)
+from components import (
+    format_count, overview_cards, format_comparison_stats, format_comparison_figure,
+    format_breakdown, format_totals_figure
+)
+
+REPORTS_DIR = os.getenv('REPORTS_DIR', os.path.join(APP_DIR, 'reports'))
+REPORT_TIME_RANGE = "Last 7 Days"
+
+_build_lock = threading.Lock()
+
+
+def snapshot_path(dashboard_key: str, day: date = None) -> str:
+    return os.path.join(REPORTS_DIR, f"{dashboard_key}-{(day or date.today()):%Y-%m-%d}.html")
+
+def latest_snapshot(dashboard_key: str) -> Optional[str]:
+    """Today's snapshot for a dashboard, or None when it has not been built this cycle"""
+    path = snapshot_path(dashboard_key)
+    return path if os.path.exists(path) else None
+
+def write_snapshot(dashboard_key: str, report_html: str) -> str:
+    """Write today's snapshot and point <dashboard>-latest.html at it"""
+    os.makedirs(REPORTS_DIR, exist_ok=True)
+    path = snapshot_path(dashboard_key)
+    # Write then rename so readers never see a half-written report
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        f.write(report_html)
+    os.replace(path + '.tmp', path)
+    shutil.copyfile(path, os.path.join(REPORTS_DIR, f"{dashboard_key}-latest.html"))
+    return path
+
+def invalidate_snapshots():
+    """Drop today's snapshots so the next request rebuilds them from fresh data"""
+    suffix = f"-{date.today():%Y-%m-%d}.html"
+    if os.path.isdir(REPORTS_DIR):
+        for name in os.listdir(REPORTS_DIR):
+            if name.endswith(suffix):
+                os.remove(os.path.join(REPORTS_DIR, name))
+
+
+def top_videos_table(videos: pd.DataFrame) -> str:
+    """Top content rows with thumbnail, linked title, channel and views"""
+    rows = []
+    for video in videos.to_dict('records'):
+        video_url = f"https://www.youtube.com/watch?v={video['id']}"
+        rows.append(
+            f'<tr><td><img src="https://img.youtube.com/vi/{video["id"]}/mqdefault.jpg" width="120"></td>'
+            f'<td><a href="{video_url}" target="_blank">{html.escape(video["title"])}</a></td>'
+            f'<td>{html.escape(video["channel"])}</td>'
+            f'<td>{format_count(video["views"])}</td>'
+            f'<td>{"Short" if video["is_short"] else "Video"}</td>'
+            f'<td>{video["published_at"]:%m/%d/%Y}</td></tr>'
+        )
+    if not rows:
+        return '<p>No videos found</p>'
+    return ('<table class="report-table"><tr><th></th><th>Title</th><th>Channel</th><th>Views</th>'
+            '<th>Format</th><th>Published</th></tr>' + ''.join(rows) + '</table>')
+
+def build_report_html(dashboard: Dict, channel_metadata: Dict[str, Dict], api_key: str,
+                      time_range: str = REPORT_TIME_RANGE, openai_api_key: str = None) -> str:
+    """Fetch a dashboard's default channels (cached frames are reused) and render the report"""
+    channels: List[str] = dashboard['default_channels']
+    start_date, end_date = get_time_range_dates(time_range)
+    frames, fetched_channels, failed_channels = [], [], []
+    for channel_name, videos, failure in stream_channels_data(
+            channels, start_date, api_key, dashboard['channels'], channel_metadata):
+        frames.append(videos)
+        (failed_channels if failure else fetched_channels).append(channel_name)
+    df = combine_channel_frames(frames)
+
+    with open(os.path.join(APP_DIR, 'assets', 'dashboard.css')) as f:
+        stylesheet = f.read()
+    sections = [
+        f"<h1>{dashboard['header']}<span style='color: #BCE5F7;'>.</span></h1>",
+        f"<p>{html.escape(dashboard['subheader'])} · {time_range} ({start_date:%m/%d} - {end_date:%m/%d}) · "
+        f"generated {datetime.now():%Y-%m-%d %H:%M}</p>"
+    ]
+    if failed_channels:
+        sections.append(f"<p>Failed to fetch data for: {html.escape(', '.join(failed_channels))}</p>")
+    if len(df) == 0:
+        sections.append("<p>No videos in the selected time range.</p>")
+    else:
+        daily_store = get_daily_store()
+        daily_store.record(df, fetched_channels, start_date, end_date)
+        window_days = (end_date.date() - start_date.date()).days + 1
+        window_vs_last_week = period_over_period(daily_store, channels, end_date.date(), window_days, lag_days=7)
+        sections.append('<div class="report-cards">' + ''.join(overview_cards(df, window_vs_last_week)) + '</div>')
+
+        figures = []
+        channel_format_stats = format_comparison_stats(df, channels)
+        if not channel_format_stats.empty:
+            figures.append(format_comparison_figure(channel_format_stats))
+        for shorts in (False, True):
+            if (df['is_short'] == shorts).any():
+                figures.append(format_totals_figure(format_breakdown(df, shorts), shorts))
+        # plotly.js goes in once, with the first chart
+        sections.extend(fig.to_html(full_html=False, include_plotlyjs=(i == 0)) for i, fig in enumerate(figures))
+
+        columns = ['title', 'views', 'id', 'channel', 'is_short', 'published_at']
+        sections.append("<h2>Top Performing Content</h2>" + top_videos_table(df.nlargest(10, 'views')[columns]))
+        sections.append("<h3>Top 5 Regular Videos</h3>" + top_videos_table(df[~df['is_short']].nlargest(5, 'views')[columns]))
+        sections.append("<h3>Top 5 Shorts</h3>" + top_videos_table(df[df['is_short']].nlargest(5, 'views')[columns]))
+
+        if openai_api_key:
+            from strategic_insights import get_llm_caller, generate_ai_insights
+            insights, _ = generate_ai_insights(df, get_llm_caller(openai_api_key), dashboard['focus'])
+            sections.append(
+                f'<div class="insight-box"><h4>Strategic Analysis for {time_range}</h4>'
+                f'<div style="white-space: pre-wrap;">{html.escape(insights)}</div></div>'
+            )
+
+    return f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{html.escape(dashboard['label'])} - {time_range}</title>
+<style>
+{stylesheet}
+body {{ font-family: Inter, sans-serif; max-width: 1200px; margin: 0 auto; padding: 24px; }}
+.report-cards {{ display: grid; grid-template-columns: repeat(4, 1fr); gap: 16px; margin-bottom: 24px; }}
+.report-table {{ border-collapse: collapse; width: 100%; }}
+.report-table td, .report-table th {{ padding: 6px 10px; border-bottom: 1px solid #eee; text-align: left; }}
+</style></head>
+<body>
+{''.join(sections)}
+</body></html>"""
+
+def build_snapshot(dashboard: Dict, channel_metadata: Dict[str, Dict], api_key: str,
+                   time_range: str = REPORT_TIME_RANGE, openai_api_key: str = None) -> str:
+    """Build and write today's snapshot for a dashboard; returns its path"""
+    return write_snapshot(
+        dashboard['key'], build_report_html(dashboard, channel_metadata, api_key, time_range, openai_api_key)
+    )
+
+def ensure_snapshot(dashboard: Dict, channel_metadata: Dict[str, Dict], api_key: str,
+                    openai_api_key: str = None) -> str:
+    """Today's snapshot path, building it first if this is the cycle's first request"""
+    path = latest_snapshot(dashboard['key'])
+    if path:
+        return path
+    # Concurrent first requests wait for one build instead of each fetching and paying for insights
+    with _build_lock:
+        return latest_snapshot(dashboard['key']) or build_snapshot(
+            dashboard, channel_metadata, api_key, openai_api_key=openai_api_key
+        )
+
+
+def main():
+    from dotenv import load_dotenv
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Build static executive report snapshots")
+    parser.add_argument('--dashboard', action='append', help="Dashboard key (repeatable; default: all)")
+    parser.add_argument('--time-range', default=REPORT_TIME_RANGE)
+    parser.add_argument('--no-insights', action='store_true', help="Skip the OpenAI call")
+    args = parser.parse_args()
+
+    api_key = get_key_ring().current()
+    dashboards, channel_metadata, problems = load_channel_registry(
+        CHANNEL_REGISTRY_PATH, os.path.getmtime(CHANNEL_REGISTRY_PATH), api_key
+    )
+    for problem in problems:
+        print(f"Registry: {problem}")
+    openai_api_key = None if args.no_insights else os.getenv('OPENAI_API_KEY') or None
+    for dashboard in dashboards:
+        if args.dashboard and dashboard['key'] not in args.dashboard:
+            continue
+        path = build_snapshot(dashboard, channel_metadata, api_key, args.time_range, openai_api_key)
+        print(f"{dashboard['label']}: {path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""Reproducible cold-start measurement for dash.py
+
+    python startup_benchmark.py [--runs 5]
+
+Each run starts a fresh interpreter with -X importtime and renders dash.py once in
+Streamlit's bare test mode with no API keys. That run draws the sidebar, header and
+setup instructions and makes no network calls. The script reports medians across runs:
+
+- time to first render (interpreter start to the finished script run)
+- cumulative import time of each heavy dependency (0 when it was never imported)
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+HEAVY_MODULES = [
+    'streamlit', 'pandas', 'numpy', 'plotly', 'plotly.graph_objects', 'plotly.express',
+    'googleapiclient.discovery', 'httplib2', 'openai', 'isodate'
+]
+
+RENDER_SNIPPET = """
+import json, time
+t0 = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({path!r}, default_timeout=120)
+at.run()
+print(json.dumps({{
+    'first_render_s': time.perf_counter() - t0,
+    'exceptions': [str(e.value) for e in at.exception]
+}}))
+"""
+
+
+def parse_importtime(stderr: str) -> dict:
+    """Cumulative microseconds per module from -X importtime output"""
+    cumulative = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cumulative_us, name = line.split('|')
+        name = name.strip()
+        if cumulative_us.strip().isdigit():
+            cumulative[name] = int(cumulative_us)
+    return cumulative
+
+
+def run_once() -> dict:
+    env = dict(os.environ, YOUTUBE_API_KEY='', YOUTUBE_API_KEY_2='', YOUTUBE_API_KEY_3='', OPENAI_API_KEY='')
+    started = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', RENDER_SNIPPET.format(path=os.path.join(APP_DIR, 'dash.py'))],
+        capture_output=True, text=True, env=env, cwd=APP_DIR, check=True
+    )
+    result = json.loads(started.stdout.strip().splitlines()[-1])
+    if result['exceptions']:
+        raise RuntimeError(f"dash.py raised during render: {result['exceptions']}")
+    imports = parse_importtime(started.stderr)
+    result['imports_ms'] = {module: imports.get(module, 0) / 1000 for module in HEAVY_MODULES}
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    runs = [run_once() for _ in range(args.runs)]
+
+    print(f"Time to first render (median of {args.runs}): "
+          f"{statistics.median(r['first_render_s'] for r in runs) * 1000:.0f} ms")
+    print("Import time (median cumulative ms):")
+    for module in HEAVY_MODULES:
+        print(f"  {module:<28}{statistics.median(r['imports_ms'][module] for r in runs):>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
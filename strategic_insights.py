@@ -0,0 +1,84 @@
+"""Strategic Insights: the GPT prompt built from local title analytics, and the cached call
+
+Shared by dash.py and report_snapshot.py, so a report built in the same process reuses
+the completion the dashboard already paid for.
+"""
+from typing import Optional, Tuple
+import pandas as pd
+import streamlit as st
+
+from title_analytics import summarize_title_performance
+from llm_calls import BudgetExceeded, DeadlineExceeded, LLMCaller, LLMResult, get_llm_usage_log
+
+
+@st.cache_resource
+def get_openai_client(api_key: str):
+    """OpenAI client, imported and built only once Strategic Insights are needed"""
+    from openai import OpenAI
+    return OpenAI(api_key=api_key)
+
+@st.cache_resource
+def get_llm_caller(api_key: str) -> LLMCaller:
+    """Deadline- and budget-aware wrapper around the OpenAI client"""
+    return LLMCaller(get_openai_client(api_key), get_llm_usage_log())
+
+@st.cache_data(ttl=3600, show_spinner=False, max_entries=50)
+def complete_prompt(_llm_caller: LLMCaller, prompt: str) -> LLMResult:
+    """One paid completion per distinct prompt per hour; failures raise and are not cached"""
+    return _llm_caller.complete(prompt, max_tokens=700, temperature=0.7)
+
+def generate_ai_insights(data: pd.DataFrame, llm_caller: LLMCaller, dashboard_focus: str) -> Tuple[str, Optional[LLMResult]]:
+    """Generate Strategic Insights from the data based on dashboard type"""
+    try:
+        # Term lift over every title in the window, computed locally so the prompt stays small
+        term_summary = summarize_title_performance(data)
+        
+        # A few concrete examples from each end so the model can cite real titles
+        top_videos = data.nlargest(5, 'views')[['title', 'views', 'channel', 'is_short']]
+        bottom_videos = data.nsmallest(5, 'views')[['title', 'views', 'channel', 'is_short']]
+        top_titles = "\n".join([f"- {v['title']} ({v['views']:,} views, {v['channel']})" for v in top_videos.to_dict('records')])
+        bottom_titles = "\n".join([f"- {v['title']} ({v['views']:,} views, {v['channel']})" for v in bottom_videos.to_dict('records')])
+        
+        if dashboard_focus == "political":
+            content_type = "conservative political commentary"
+            context_note = "ALL content is political, so don't mention that politics works - be VERY SPECIFIC about what types of political content work."
+        else:
+            content_type = "sports and college football commentary"
+            context_note = "ALL content is sports-related, so don't mention that sports content works - be VERY SPECIFIC about what types of sports content, teams, players, or topics work."
+
+        prompt = f"""You are analyzing YouTube performance data for {content_type} channels. {context_note}
+
+TITLE TERM ANALYSIS (every video in the window):
+{term_summary}
+
+EXAMPLE TOP PERFORMERS:
+{top_titles}
+
+EXAMPLE BOTTOM PERFORMERS:
+{bottom_titles}
+
+Provide 5 SPECIFIC insights about content performance. BE EXTREMELY SPECIFIC - mention actual names, events, and topics from the terms and titles above:
+
+1. WINNING TOPICS: What SPECIFIC subjects, people, or events are driving views? (Use actual examples from the titles)
+
+2. LOSING TOPICS: What SPECIFIC subjects or approaches are failing? Use the bottom-decile terms - what topics/people/events appear there but NOT in top performers?
+
+3. TITLE PATTERNS: Compare successful vs unsuccessful titles. What specific words, phrases, or formats work? (e.g., questions vs statements, name-dropping, specific trigger words)
+
+4. ENGAGEMENT DRIVERS: Which specific topics get high engagement even if views are lower? What controversial subjects or people drive comments?
+
+5. CONTENT GAPS: Based on what's working, what SPECIFIC related topics are missing that could perform well?
+
+DO NOT give generic advice. 
+DO mention specific people's names, specific events, specific controversies from the actual titles.
+Base everything on the term analysis and video titles provided above."""
+
+        result = complete_prompt(llm_caller, prompt)
+        return result.text, result
+        
+    except BudgetExceeded as e:
+        return f"Strategic Insights paused: {str(e)}", None
+    except DeadlineExceeded as e:
+        return f"AI analysis timed out: {str(e)}", None
+    except Exception as e:
+        return f"AI analysis temporarily unavailable: {str(e)}", None
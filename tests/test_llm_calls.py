@@ -0,0 +1,107 @@
+"""LLMCaller against a local fake client: fallback, budget refusal and usage rows"""
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from llm_calls import BudgetExceeded, LLMCaller, LLMUsageLog, estimate_cost
+
+
+class FakeClient:
+    """chat.completions.create that answers after a per-model delay (None hangs until released)"""
+
+    def __init__(self, delays=None, usage=(120, 40)):
+        self.delays = delays or {}
+        self.usage = usage
+        self.calls = []
+        self.release = threading.Event()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, model, messages, max_tokens, temperature):
+        self.calls.append(model)
+        delay = self.delays.get(model, 0)
+        if delay is None:
+            self.release.wait()
+        else:
+            time.sleep(delay)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=f"answer from {model}"))],
+            usage=SimpleNamespace(prompt_tokens=self.usage[0], completion_tokens=self.usage[1])
+        )
+
+
+@pytest.fixture
+def usage_log(tmp_path):
+    return LLMUsageLog(str(tmp_path / 'usage.sqlite'))
+
+
+def rows(usage_log):
+    with sqlite3.connect(usage_log._path) as db:
+        return db.execute("SELECT model, prompt_tokens, completion_tokens, cost_usd, outcome FROM calls "
+                          "ORDER BY rowid").fetchall()
+
+
+def test_slow_primary_falls_back_within_deadline(usage_log):
+    client = FakeClient(delays={'gpt-4': 5})
+    caller = LLMCaller(client, usage_log, model='gpt-4', fallback_model='gpt-4o-mini', deadline_s=1.0)
+
+    started = time.monotonic()
+    result = caller.complete("prompt " * 20)
+
+    assert time.monotonic() - started < 1.0
+    assert result.model == 'gpt-4o-mini' and result.fell_back
+    assert [(model, outcome) for model, *_, outcome in rows(usage_log)] == [
+        ('gpt-4', 'timeout'), ('gpt-4o-mini', 'ok')
+    ]
+    # The timeout is remembered, so the next call goes straight to the fallback
+    caller.complete("another prompt")
+    assert client.calls == ['gpt-4', 'gpt-4o-mini', 'gpt-4o-mini']
+
+
+def test_hung_calls_do_not_block_later_ones(usage_log):
+    client = FakeClient(delays={'gpt-4': None})
+    caller = LLMCaller(client, usage_log, model='gpt-4', fallback_model=None, deadline_s=0.2)
+    try:
+        for _ in range(6):
+            with pytest.raises(Exception):
+                caller.complete("prompt")
+        client.delays['gpt-4'] = 0
+        assert caller.complete("prompt").text == "answer from gpt-4"
+    finally:
+        client.release.set()
+
+
+def test_budget_refusal_makes_no_call(usage_log):
+    usage_log.record('gpt-4', 1000, 1000, 1.0, 5.0, 'ok', datetime.now())
+    client = FakeClient()
+    caller = LLMCaller(client, usage_log, model='gpt-4', fallback_model='gpt-4o-mini', daily_budget_usd=5.0)
+
+    with pytest.raises(BudgetExceeded):
+        caller.complete("prompt", max_tokens=700)
+    assert client.calls == []
+    assert len(rows(usage_log)) == 1
+
+
+def test_budget_falls_back_to_cheaper_model(usage_log):
+    # $0.01 left: too little for gpt-4's worst case (about $0.04), plenty for gpt-4o-mini
+    usage_log.record('gpt-4', 1000, 1000, 1.0, 4.99, 'ok', datetime.now())
+    client = FakeClient()
+    caller = LLMCaller(client, usage_log, model='gpt-4', fallback_model='gpt-4o-mini', daily_budget_usd=5.0)
+
+    assert caller.complete("prompt", max_tokens=700).model == 'gpt-4o-mini'
+    assert client.calls == ['gpt-4o-mini']
+
+
+def test_usage_row_records_tokens_and_cost(usage_log):
+    client = FakeClient(usage=(120, 40))
+    caller = LLMCaller(client, usage_log, model='gpt-4o', fallback_model=None)
+
+    result = caller.complete("prompt")
+
+    assert rows(usage_log) == [('gpt-4o', 120, 40, pytest.approx(estimate_cost('gpt-4o', 120, 40)), 'ok')]
+    assert result.cost_usd == pytest.approx(estimate_cost('gpt-4o', 120, 40))
+    summary = usage_log.day_summary(datetime.now().strftime('%Y-%m-%d'))
+    assert summary['calls'] == 1 and summary['tokens'] == 160 and summary['failures'] == 0
@@ -0,0 +1,407 @@
+"""Local title analytics: which words, phrases and names go with performance
+
+Runs over every title in the dataset with vectorized pandas/NumPy so the AI prompt can
+carry a compact summary of the whole window instead of a handful of raw titles.
+TitleIndex groups titles that cover the same story across channels.
+"""
+import re
+import threading
+import time
+import zlib
+from typing import Iterable, List, Tuple
+import numpy as np
+import pandas as pd
+
+from freshness import RETAIN_FOR
+
+STOPWORDS = frozenset("""
+a about after again against all am an and any are as at be because been before being but by can could
+did do does doing down during each few for from further had has have having he her here hers him his
+how i if in into is it its just me more most my no nor not now of off on once only or other our out over
+own same she should so some such than that the their them then there these they this those through to
+too under until up very was we were what when where which while who whom why will with would you your
+vs ft feat w full episode ep live new
+""".split())
+
+WORD_PATTERN = re.compile(r"[a-z0-9][a-z0-9']*")
+# Words and single punctuation marks, so runs of capitalised words break at punctuation
+TOKEN_PATTERN = re.compile(r"[A-Za-z0-9][\w'.-]*|[^\w\s]")
+CAPITALISED = re.compile(r"[A-Z][a-z'.-]+")
+# Verbs and filler that YouTube titles capitalise but that never belong to a name
+NAME_BREAKERS = STOPWORDS | frozenset("""
+react reacts reacting reaction responds response says said slams slammed destroys destroyed explains reveals
+exposes exposed calls claims wins loses lost makes gets goes has had wants talks breaks admits fires fired
+attacks rips blasts debates confronts warns shows takes tells asks drops announces refuses leaves joins owns
+humiliates torches melts returns sues speaks interview interviews just finally gone breaking watch why
+big huge best worst top real really official
+""".split())
+
+
+def title_names(title: str) -> List[str]:
+    """Runs of two or three capitalised words ("Kamala Harris", "Ohio State") in a title
+
+    Runs break at punctuation, stopwords and common title verbs. In Title Case titles
+    capitals carry no signal, so those yield nothing and their names count as phrases.
+    ALL-CAPS emphasis ("DESTROYS") is left out; single words are already covered as unigrams.
+    """
+    tokens = TOKEN_PATTERN.findall(title)
+    words = [t for t in tokens if t[0].isalpha()]
+    if not words or all(w[0].isupper() for w in words):
+        return []
+    names, run = [], []
+    for token in tokens + ['.']:
+        possessive = token.endswith("'s")
+        word = token[:-2] if possessive else token
+        if CAPITALISED.fullmatch(word) and word.lower() not in NAME_BREAKERS:
+            run.append(word)
+            if not possessive:
+                continue
+            # "Joe Biden's Big Speech": the possessive ends the name
+        if 2 <= len(run) <= 3:
+            names.append(' '.join(run))
+        run = []
+    return names
+
+
+def extract_terms(titles: pd.Series) -> pd.DataFrame:
+    """Long (row, term, kind) frame of unigrams, bigrams and named terms, one row per distinct term per title"""
+    words = titles.str.lower().str.findall(WORD_PATTERN)
+
+    unigrams = words.explode().dropna()
+    unigrams = unigrams[~unigrams.isin(STOPWORDS) & (unigrams.str.len() > 2)]
+
+    # Bigrams by pairing each word with the next one in the same title
+    flat = words.explode().dropna()
+    following = flat.groupby(level=0).shift(-1)
+    pairs = pd.DataFrame({'first': flat, 'second': following}).dropna()
+    pairs = pairs[~pairs['first'].isin(STOPWORDS) & ~pairs['second'].isin(STOPWORDS)]
+    bigrams = pairs['first'] + ' ' + pairs['second']
+
+    names = titles.map(title_names).explode().dropna()
+
+    terms = pd.concat([
+        pd.DataFrame({'term': unigrams, 'kind': 'word'}),
+        pd.DataFrame({'term': bigrams, 'kind': 'phrase'}),
+        pd.DataFrame({'term': names, 'kind': 'name'}),
+    ])
+    terms.index.name = 'row'
+    return terms.reset_index().drop_duplicates(['row', 'term'])
+
+
+def term_lift(df: pd.DataFrame, min_videos: int = 3) -> pd.DataFrame:
+    """Per-term lift of views and engagement across every title in df
+
+    Performance is views relative to the video's channel median, so a term is judged
+    against what its channel normally gets rather than by channel size. Columns:
+    videos, top_lift / bottom_lift (share of top / bottom decile videos containing the
+    term over its overall share), performance (median of views / channel median) and
+    engagement (mean engagement rate relative to the dataset mean).
+    """
+    data = df.reset_index(drop=True)
+    views = data['views'].to_numpy(dtype=float)
+    channel_median = data.groupby('channel')['views'].transform('median').to_numpy(dtype=float)
+    performance = views / np.maximum(channel_median, 1)
+    engagement = np.where(views > 0, (data['likes'] + data['comments']).to_numpy() / np.maximum(views, 1) * 100, 0)
+
+    top = performance >= np.quantile(performance, 0.9)
+    bottom = performance <= np.quantile(performance, 0.1)
+
+    terms = extract_terms(data['title'])
+    rows = terms['row'].to_numpy()
+    terms = terms.assign(
+        top=top[rows], bottom=bottom[rows], performance=performance[rows], engagement=engagement[rows]
+    )
+    stats = terms.groupby(['term', 'kind']).agg(
+        videos=('row', 'size'), top=('top', 'sum'), bottom=('bottom', 'sum'),
+        performance=('performance', 'median'), engagement=('engagement', 'mean')
+    )
+    stats = stats[stats['videos'] >= min_videos]
+
+    n = len(data)
+    share = stats['videos'] / n
+    stats['top_lift'] = (stats['top'] / max(top.sum(), 1)) / share
+    stats['bottom_lift'] = (stats['bottom'] / max(bottom.sum(), 1)) / share
+    stats['engagement'] = stats['engagement'] / max(engagement.mean(), 1e-9)
+    return stats.drop(columns=['top', 'bottom']).reset_index()
+
+
+def summarize_title_performance(df: pd.DataFrame, per_section: int = 12) -> str:
+    """Compact text summary of term lift over the whole dataset, sized for an LLM prompt"""
+    if len(df) == 0:
+        return "No videos in range."
+
+    min_videos = max(3, len(df) // 500)
+    stats = term_lift(df, min_videos=min_videos)
+    # Prefer names and phrases over their component words when both qualify
+    stats['rank_bonus'] = stats['kind'].map({'name': 1.1, 'phrase': 1.1, 'word': 1.0})
+
+    def distinct(frame: pd.DataFrame) -> pd.DataFrame:
+        # Skip terms that share a word with a better-scoring pick ("musk reacts" after "Elon Musk")
+        picked, seen_words = [], set()
+        for position, term in enumerate(frame.sort_values('score', ascending=False)['term']):
+            words = set(term.lower().split())
+            if words & seen_words:
+                continue
+            picked.append(position)
+            seen_words |= words
+            if len(picked) == per_section:
+                break
+        return frame.sort_values('score', ascending=False).iloc[picked]
+
+    def section(frame: pd.DataFrame) -> str:
+        lines = [
+            f"- {row.term} ({row.kind}): {row.videos} videos, top-decile lift {row.top_lift:.1f}x, "
+            f"bottom-decile lift {row.bottom_lift:.1f}x, {row.performance:.1f}x channel median views, "
+            f"{row.engagement:.1f}x avg engagement"
+            for row in frame.itertuples()
+        ]
+        return "\n".join(lines) if lines else "- (none with enough videos)"
+
+    # Lift weighted by support, so a term seen in 200 videos beats a lucky one seen in 3
+    stats['support'] = np.log1p(stats['videos']) * stats['rank_bonus']
+    winners = stats[stats['top_lift'] > 1.5].assign(score=lambda s: s['top_lift'] * s['support'])
+    losers = stats[(stats['bottom_lift'] > 1.5) & (stats['top_lift'] < 0.5)].assign(
+        score=lambda s: s['bottom_lift'] * s['support'])
+    engaging = stats[stats['engagement'] > 1.3].assign(score=lambda s: s['engagement'] * s['support'])
+
+    engagement_rate = (df['likes'].sum() + df['comments'].sum()) / max(df['views'].sum(), 1) * 100
+    header = (
+        f"DATASET: {len(df):,} videos from {df['channel'].nunique()} channels, "
+        f"median {df['views'].median():,.0f} views, {engagement_rate:.1f}% engagement. "
+        f"Terms need at least {min_videos} videos. Performance is views relative to each channel's median."
+    )
+    return "\n\n".join([
+        header,
+        "TERMS OVER-REPRESENTED IN TOP 10% (lift = share of top-decile videos / overall share):\n"
+        + section(distinct(winners)),
+        "TERMS OVER-REPRESENTED IN BOTTOM 10% AND RARE IN THE TOP:\n"
+        + section(distinct(losers)),
+        "HIGH-ENGAGEMENT TERMS:\n"
+        + section(distinct(engaging)),
+    ])
+
+
+def title_features(titles: pd.Series, n_features: int) -> pd.Series:
+    """Hashed unigram and bigram features per title (stopwords and short words dropped)"""
+    words = titles.str.lower().str.findall(WORD_PATTERN).explode().dropna()
+    words = words[~words.isin(STOPWORDS) & (words.str.len() > 2)]
+    # Bigrams over the remaining words, so "border crisis" matches "border *the* crisis"
+    following = words.groupby(level=0).shift(-1)
+    bigrams = (words + ' ' + following).dropna()
+    tokens = pd.concat([words, bigrams])
+    # Hash each distinct token once; crc32 keeps features stable across processes
+    codes, uniques = pd.factorize(tokens)
+    hashed = np.array([zlib.crc32(token.encode()) % n_features for token in uniques], dtype=np.int64)
+    return pd.Series(hashed[codes], index=tokens.index)
+
+
+class TitleIndex:
+    """Incremental hashed TF-IDF index of video titles with cosine lookup in NumPy
+
+    Titles are added by video ID and only new or retitled videos are tokenized, so a
+    refresh costs as much as the videos it brings in. Postings are kept as flat
+    (document, feature) arrays; lookups score only the documents that share a feature
+    with the query, which keeps them interactive at tens of thousands of titles.
+    Videos no added dataset has contained for retain_s are dropped, and the arrays are
+    compacted once dropped rows outnumber live ones, so memory follows the live window.
+    """
+
+    def __init__(self, n_features: int = 2 ** 20, retain_s: float = RETAIN_FOR.total_seconds(),
+                 clock=time.monotonic):
+        self.n_features = n_features
+        self.retain_s = retain_s
+        self.clock = clock
+        self.ids, self.titles = [], []
+        self._row_of = {}
+        self._alive = np.zeros(0, dtype=bool)
+        self._last_seen = np.zeros(0)
+        self._doc_freq = np.zeros(n_features, dtype=np.int64)
+        self._chunks = []
+        self._sorted = None
+        self.version = 0
+        self._lock = threading.Lock()
+
+    def add(self, ids: Iterable[str], titles: Iterable[str]) -> int:
+        """Index new videos and re-index retitled ones; returns how many were (re)indexed"""
+        with self._lock:
+            now = self.clock()
+            fresh, seen = {}, []
+            for video_id, title in zip(ids, titles):
+                row = self._row_of.get(video_id)
+                if row is None or self.titles[row] != title:
+                    fresh[video_id] = title
+                else:
+                    seen.append(row)
+            self._last_seen[seen] = now
+            self._forget_unseen(now)
+            if not fresh:
+                return 0
+
+            # A retitled video gets a new row; the old one stops counting
+            stale = np.array([self._row_of[v] for v in fresh if v in self._row_of], dtype=np.int64)
+            if len(stale):
+                docs, feats = self._postings()
+                np.subtract.at(self._doc_freq, feats[np.isin(docs, stale)], 1)
+                self._alive[stale] = False
+
+            first_row = len(self.ids)
+            for offset, video_id in enumerate(fresh):
+                self._row_of[video_id] = first_row + offset
+            self.ids.extend(fresh)
+            self.titles.extend(fresh.values())
+            self._alive = np.concatenate([self._alive, np.ones(len(fresh), dtype=bool)])
+            self._last_seen = np.concatenate([self._last_seen, np.full(len(fresh), now)])
+
+            features = title_features(pd.Series(list(fresh.values())), self.n_features)
+            pairs = pd.DataFrame({'doc': features.index + first_row, 'feature': features.to_numpy()})
+            pairs = pairs.drop_duplicates()
+            docs, feats = pairs['doc'].to_numpy(np.int64), pairs['feature'].to_numpy(np.int64)
+            np.add.at(self._doc_freq, feats, 1)
+            self._chunks.append((docs, feats))
+            self._sorted = None
+            self.version += 1
+            return len(fresh)
+
+    def _forget_unseen(self, now: float):
+        """Drop videos not added for retain_s; compact once dropped rows outnumber live ones (lock held)"""
+        expired = np.flatnonzero(self._alive & (self._last_seen < now - self.retain_s))
+        if len(expired):
+            docs, feats = self._postings()
+            np.subtract.at(self._doc_freq, feats[np.isin(docs, expired)], 1)
+            self._alive[expired] = False
+            for row in expired:
+                del self._row_of[self.ids[row]]
+            self._sorted = None
+            self.version += 1
+
+        dead = len(self.ids) - int(self._alive.sum())
+        if dead > max(1000, len(self.ids) - dead):
+            # Renumber live rows densely; postings and row lookups move with them
+            docs, feats = self._postings()
+            live = np.flatnonzero(self._alive)
+            new_row = np.full(len(self.ids), -1, dtype=np.int64)
+            new_row[live] = np.arange(len(live))
+            self._chunks = [(new_row[docs], feats)]
+            self._sorted = self._chunks[0]
+            self.ids = [self.ids[row] for row in live]
+            self.titles = [self.titles[row] for row in live]
+            self._row_of = {video_id: row for row, video_id in enumerate(self.ids)}
+            self._alive = np.ones(len(live), dtype=bool)
+            self._last_seen = self._last_seen[live]
+            self.version += 1
+
+    def rows_for(self, ids: Iterable[str]) -> np.ndarray:
+        return np.array([self._row_of[v] for v in ids], dtype=np.int64)
+
+    def _postings(self) -> Tuple[np.ndarray, np.ndarray]:
+        """All live (doc, feature) postings, sorted by feature"""
+        if self._sorted is None:
+            if not self._chunks:
+                return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+            docs = np.concatenate([c[0] for c in self._chunks])
+            feats = np.concatenate([c[1] for c in self._chunks])
+            live = self._alive[docs]
+            docs, feats = docs[live], feats[live]
+            order = np.argsort(feats, kind='stable')
+            self._chunks = [(docs[order], feats[order])]
+            self._sorted = self._chunks[0]
+        return self._sorted
+
+    def _weights(self, docs: np.ndarray, feats: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """IDF weight per posting and L2 norm per document"""
+        n_docs = max(int(self._alive.sum()), 1)
+        idf = np.log((1 + n_docs) / (1 + self._doc_freq[feats])) + 1
+        norms = np.sqrt(np.bincount(docs, weights=idf ** 2, minlength=len(self.ids)))
+        return idf, np.maximum(norms, 1e-12)
+
+    def similar(self, text: str, rows: np.ndarray = None, top: int = 20) -> Tuple[np.ndarray, np.ndarray]:
+        """Rows most similar to text (optionally restricted to rows) and their cosine scores"""
+        with self._lock:
+            docs, feats = self._postings()
+            query = np.unique(title_features(pd.Series([text]), self.n_features).to_numpy())
+            if len(query) == 0 or len(docs) == 0:
+                return np.zeros(0, dtype=np.int64), np.zeros(0)
+            idf, norms = self._weights(docs, feats)
+
+            # Slice the postings of each query feature out of the feature-sorted arrays
+            starts = np.searchsorted(feats, query, side='left')
+            ends = np.searchsorted(feats, query, side='right')
+            hits = np.concatenate([np.arange(s, e) for s, e in zip(starts, ends)])
+            if len(hits) == 0:
+                return np.zeros(0, dtype=np.int64), np.zeros(0)
+            query_idf = np.log((1 + max(int(self._alive.sum()), 1)) / (1 + self._doc_freq[query])) + 1
+            scores = np.bincount(docs[hits], weights=idf[hits] ** 2, minlength=len(self.ids))
+            scores = scores / (norms * np.linalg.norm(query_idf))
+
+        if rows is not None:
+            mask = np.zeros(len(scores), dtype=bool)
+            mask[rows] = True
+            scores = np.where(mask, scores, 0)
+        best = np.argsort(-scores)[:top]
+        best = best[scores[best] > 0]
+        return best, scores[best]
+
+    def clusters(self, rows: np.ndarray, threshold: float = 0.45, window: int = 8) -> np.ndarray:
+        """Cluster label per row (aligned with rows): single-link groups above threshold cosine
+
+        Candidate pairs are titles within window places of each other in a posting list
+        ordered by a MinHash signature, so titles sharing most features sit together even
+        in long lists and the pair count stays linear in the number of postings. Each
+        candidate pair then gets its exact cosine.
+        """
+        with self._lock:
+            docs, feats = self._postings()
+            idf, norms = self._weights(docs, feats)
+
+        labels = np.arange(len(rows))
+        position = np.full(len(self.ids), -1, dtype=np.int64)
+        position[rows] = labels
+        keep = position[docs] >= 0
+        docs, feats, weights = position[docs[keep]], feats[keep], idf[keep] ** 2
+        norms = norms[rows]
+        # Only features at least two of these titles share can contribute to a dot product
+        run_starts = np.flatnonzero(np.r_[True, feats[1:] != feats[:-1]])
+        run_lengths = np.diff(np.r_[run_starts, len(feats)])
+        shared = np.repeat(run_lengths >= 2, run_lengths)
+        docs, feats, weights = docs[shared], feats[shared], weights[shared]
+        if len(docs) == 0:
+            return labels
+
+        signature = np.full(len(rows), np.iinfo(np.int64).max)
+        np.minimum.at(signature, docs, (feats * 2654435761) % (2 ** 32))
+        order = np.lexsort((signature[docs], feats))
+        run_docs, run_feats = docs[order], feats[order]
+        candidates = []
+        for offset in range(1, window + 1):
+            same_run = np.flatnonzero(run_feats[:-offset] == run_feats[offset:])
+            first, second = run_docs[same_run], run_docs[same_run + offset]
+            candidates.append(np.minimum(first, second) * len(rows) + np.maximum(first, second))
+        pair_keys = np.concatenate(candidates)
+        pair_keys.sort()
+        pair_keys = pair_keys[np.r_[True, pair_keys[1:] != pair_keys[:-1]]]
+        a, b = pair_keys // len(rows), pair_keys % len(rows)
+
+        # Exact dot products: walk a's features and look each one up in b's
+        by_doc = np.lexsort((feats, docs))
+        posting_keys = docs[by_doc] * self.n_features + feats[by_doc]
+        posting_weights = weights[by_doc]
+        indptr = np.r_[0, np.cumsum(np.bincount(docs, minlength=len(rows)))]
+        counts = indptr[a + 1] - indptr[a]
+        pair_of = np.repeat(np.arange(len(a)), counts)
+        within = np.arange(len(pair_of)) - np.repeat(np.cumsum(counts) - counts, counts)
+        from_a = indptr[a][pair_of] + within
+        wanted = b[pair_of] * self.n_features + feats[by_doc][from_a]
+        found = np.minimum(np.searchsorted(posting_keys, wanted), len(posting_keys) - 1)
+        shared = posting_keys[found] == wanted
+        dots = np.bincount(pair_of[shared], weights=posting_weights[from_a[shared]], minlength=len(a))
+        linked = dots / (norms[a] * norms[b]) >= threshold
+        a, b = a[linked], b[linked]
+
+        # Connected components by repeated min-label propagation with pointer jumping
+        while True:
+            previous = labels.copy()
+            np.minimum.at(labels, a, labels[b])
+            np.minimum.at(labels, b, labels[a])
+            labels = labels[labels]
+            if np.array_equal(labels, previous):
+                return labels
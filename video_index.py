@@ -0,0 +1,148 @@
+"""Precomputed filter indexes over a videos frame
+
+Built once per combined dataset and shared through the video cache. Each dimension
+(channel, format, publish day, publish hour, duration bucket) keeps a sorted array of
+row positions per value, so a filter combination is the intersection of a few posting
+lists, never a boolean scan of the whole frame. Rows are also ranked by views once, so
+top-N queries only touch the rows that matched.
+"""
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+from youtube_data import get_video_cache, get_freshness_scheduler
+
+# (label, lower bound in seconds inclusive, upper bound exclusive); "1-3 min" ends where
+# is_short does (duration <= 181), so every Short falls in the first two buckets
+DURATION_BUCKETS = [
+    ("Under 1 min", 0, 60),
+    ("1-3 min", 60, 182),
+    ("3-10 min", 182, 600),
+    ("10-30 min", 600, 1800),
+    ("30-60 min", 1800, 3600),
+    ("Over 60 min", 3600, float('inf')),
+]
+
+
+def postings(codes: np.ndarray, size: int) -> List[np.ndarray]:
+    """Ascending row positions for each code 0..size-1"""
+    order = np.argsort(codes, kind='stable')
+    bounds = np.searchsorted(codes[order], np.arange(size + 1))
+    return [order[bounds[i]:bounds[i + 1]] for i in range(size)]
+
+
+class VideoIndex:
+    """Row-position indexes per channel, format, day, hour and duration bucket, plus a views ranking"""
+
+    def __init__(self, df: pd.DataFrame):
+        self.rows = len(df)
+        published = df['published_at']
+        if published.dt.tz is None:
+            published = published.dt.tz_localize('UTC')
+        # Days and hours in server local time, the clock get_time_range_dates draws the date range in
+        published = published.dt.tz_convert(datetime.now().astimezone().tzinfo)
+        channel_codes, self.channels = pd.factorize(df['channel'], sort=True)
+        day_codes, self.days = pd.factorize(published.dt.date, sort=True)
+        duration = df['duration_seconds'].to_numpy(float)
+        # Per dimension: the values in code order and each row's code
+        self._values = {
+            'channel': list(self.channels),
+            'format': [False, True],
+            'day': list(self.days),
+            'hour': list(range(24)),
+            'duration': [label for label, _, _ in DURATION_BUCKETS],
+        }
+        self._codes = {
+            'channel': channel_codes,
+            'format': df['is_short'].to_numpy(dtype=bool).astype(np.int8),
+            'day': day_codes,
+            'hour': published.dt.hour.to_numpy(dtype=np.int8),
+            'duration': np.searchsorted([lo for _, lo, _ in DURATION_BUCKETS[1:]], duration, side='right'),
+        }
+        self._postings = {dim: postings(codes, len(self._values[dim])) for dim, codes in self._codes.items()}
+
+        # Rank 0 is the most viewed video; ties keep frame order
+        self.views = df['views'].to_numpy()
+        self._by_views = np.argsort(-self.views, kind='stable')
+        self._rank = np.empty(self.rows, dtype=np.int64)
+        self._rank[self._by_views] = np.arange(self.rows)
+
+    def __sizeof__(self) -> int:
+        # Lets the video cache count the index against its memory budget
+        arrays = [self.views, self._by_views, self._rank, *self._codes.values(),
+                  *(p for lists in self._postings.values() for p in lists)]
+        return object.__sizeof__(self) + sum(a.nbytes for a in arrays)
+
+    def posting(self, dim: str, value) -> np.ndarray:
+        """Ascending row positions with value in dimension dim ('channel', 'format', 'day', 'hour', 'duration')
+
+        Days and hours are server local time.
+        """
+        values = self._values[dim]
+        return self._postings[dim][values.index(value)] if value in values else np.empty(0, dtype=np.int64)
+
+    def select(self, channels: Iterable[str] = None, shorts: Optional[bool] = None, days: Iterable = None,
+               hours: Tuple[int, int] = None, durations: Iterable[str] = None, min_views: int = 0) -> np.ndarray:
+        """Row positions matching every given filter (None means no filter on that dimension)
+
+        Positions come grouped by the rarest filter's values, not sorted; top() and counts()
+        do not need them in order.
+        """
+        wanted = {
+            'channel': channels,
+            'format': None if shorts is None else [shorts],
+            'day': days,
+            'hour': None if hours is None or tuple(hours) == (0, 23) else range(hours[0], hours[1] + 1),
+            'duration': durations,
+        }
+        filters = []
+        for dim, values in wanted.items():
+            if values is None:
+                continue
+            values = set(values)
+            codes = [i for i, value in enumerate(self._values[dim]) if value in values]
+            filters.append((sum(len(self._postings[dim][c]) for c in codes), dim, codes))
+
+        if not filters:
+            positions = np.arange(self.rows)
+        else:
+            # Start from the rarest filter's rows and intersect the rest by per-row code lookups,
+            # so no step costs more than the smallest posting list
+            filters.sort(key=lambda f: f[0])
+            _, dim, codes = filters[0]
+            lists = [self._postings[dim][c] for c in codes]
+            # Values of one dimension never share a row, so their union is a plain concatenation
+            positions = np.concatenate(lists) if lists else np.empty(0, dtype=np.int64)
+            for _, dim, codes in filters[1:]:
+                allowed = np.zeros(len(self._values[dim]), dtype=bool)
+                allowed[codes] = True
+                positions = positions[allowed[self._codes[dim][positions]]]
+        if min_views > 0:
+            positions = positions[self.views[positions] >= min_views]
+        return positions
+
+    def top(self, positions: np.ndarray, n: int) -> np.ndarray:
+        """Row positions of the n most viewed among positions, most viewed first"""
+        ranks = self._rank[positions]
+        if len(ranks) > n:
+            ranks = np.partition(ranks, n - 1)[:n]
+        return self._by_views[np.sort(ranks)]
+
+    def counts(self, positions: np.ndarray) -> Dict[str, int]:
+        """Matches per format, for the filter summary"""
+        shorts = int(np.count_nonzero(self._codes['format'][positions]))
+        return {'videos': len(positions), 'shorts': shorts, 'regular': len(positions) - shorts}
+
+
+def get_video_index(df: pd.DataFrame) -> VideoIndex:
+    """Index for a combined frame, built once and shared by every session viewing the same data"""
+    token = df.attrs.get('cache_token')
+    if token is None:
+        # Frames from the data service are rebuilt on every run, so there is nothing to key on
+        return VideoIndex(df)
+    return get_video_cache().get_or_compute(
+        ('index',) + token, lambda: VideoIndex(df),
+        ttl=get_freshness_scheduler().tiers[0][1].total_seconds(),
+        label=f"filter index, {len(df):,} videos"
+    )
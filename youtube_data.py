@@ -0,0 +1,820 @@
+"""YouTube data layer shared by the dashboard and the standalone data service
+
+Everything here is free of page rendering, so it can be imported both by dash.py and by
+data_service.py. Streamlit's caches work outside a running app, so the same
+st.cache_data / st.cache_resource layers back both processes.
+"""
+import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+import pandas as pd
+from datetime import datetime, timedelta, timezone
+from googleapiclient.errors import HttpError
+import json
+import re
+import sqlite3
+import threading
+import time
+import http.client
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from typing import Dict, List, Tuple
+import httplib2
+from dotenv import load_dotenv
+from youtube_retry import AdaptiveRateLimiter, RetryBudget, RetryPolicy, classify_error
+from cache_manager import BoundedCache
+from freshness import RETAIN_FOR, FreshnessScheduler, parse_published
+import os
+
+# Load environment variables
+load_dotenv()
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Get API keys from environment
+DEFAULT_YOUTUBE_KEYS = [
+    os.getenv('YOUTUBE_API_KEY', ''),
+    os.getenv('YOUTUBE_API_KEY_2', ''),
+    os.getenv('YOUTUBE_API_KEY_3', '')
+]
+DEFAULT_YOUTUBE_KEYS = [key for key in DEFAULT_YOUTUBE_KEYS if key]  # Remove empty keys
+
+# Trim YouTube responses to the fields we use (set to 0 to compare against full payloads)
+RESPONSE_SHAPING = os.getenv('YOUTUBE_RESPONSE_SHAPING', '1') != '0'
+
+# Channel registry: dashboards and their channels live in a config file
+CHANNEL_REGISTRY_PATH = os.getenv('CHANNEL_REGISTRY', os.path.join(APP_DIR, 'channels.json'))
+CHANNEL_METADATA_CACHE_PATH = os.getenv('CHANNEL_METADATA_CACHE', os.path.join(APP_DIR, '.channel_cache.json'))
+CHANNEL_METADATA_MAX_AGE = timedelta(days=7)
+
+# Memory budgets for the process-wide caches (shared by every session)
+VIDEO_CACHE_BUDGET_MB = float(os.getenv('VIDEO_CACHE_BUDGET_MB', '256'))
+ETAG_CACHE_BUDGET_MB = float(os.getenv('ETAG_CACHE_BUDGET_MB', '32'))
+# search.list costs 100 units, so channels without an uploads playlist are relisted at most this often
+SEARCH_LISTING_TTL = 6 * 3600
+
+# Daily rollups behind the period-over-period deltas
+DAILY_AGGREGATES_PATH = os.getenv('DAILY_AGGREGATES_DB', os.path.join(APP_DIR, '.daily_aggregates.sqlite'))
+
+# Response shaping: partial responses and wire-size metering
+SEARCH_FIELDS = "etag,nextPageToken,items/id/videoId"
+PLAYLIST_FIELDS = "etag,nextPageToken,items/contentDetails(videoId,videoPublishedAt)"
+CHANNEL_FIELDS = "items(id,snippet/title,contentDetails/relatedPlaylists/uploads,statistics/subscriberCount)"
+VIDEO_DETAIL_FIELDS = (
+    "etag,items(id,snippet(title,publishedAt,thumbnails/medium/url),"
+    "contentDetails/duration,statistics(viewCount,likeCount,commentCount))"
+)
+VIDEO_STATISTICS_FIELDS = "etag,items(id,statistics(viewCount,likeCount,commentCount))"
+
+def response_fields(mask: str) -> Dict:
+    """fields= parameter for a list() call, or nothing when shaping is off"""
+    return {'fields': mask} if RESPONSE_SHAPING else {}
+
+class PayloadMeter:
+    """Running totals of YouTube response bytes, on the wire and after decompression"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.wire_bytes = 0
+        self.decoded_bytes = 0
+
+    def record(self, wire_bytes: int, decoded_bytes: int):
+        with self._lock:
+            self.requests += 1
+            self.wire_bytes += wire_bytes
+            self.decoded_bytes += decoded_bytes
+
+@st.cache_resource
+def get_payload_meter() -> PayloadMeter:
+    """Process-wide payload meter"""
+    return PayloadMeter()
+
+# Raw body bytes read by the current thread's in-flight request
+_wire_bytes = threading.local()
+
+class _MeteredResponse(http.client.HTTPResponse):
+    # http.client never decodes gzip, so this counts the bytes that crossed the wire
+    def read(self, amt=None):
+        data = super().read(amt)
+        _wire_bytes.count = getattr(_wire_bytes, 'count', 0) + len(data)
+        return data
+
+class _MeteredHTTPConnection(httplib2.HTTPConnectionWithTimeout):
+    response_class = _MeteredResponse
+
+class _MeteredHTTPSConnection(httplib2.HTTPSConnectionWithTimeout):
+    response_class = _MeteredResponse
+
+class MeteredHttp(httplib2.Http):
+    """httplib2.Http that reports wire and decoded response sizes to the payload meter"""
+
+    _connection_types = {'http': _MeteredHTTPConnection, 'https': _MeteredHTTPSConnection}
+
+    def request(self, uri, method="GET", body=None, headers=None, redirections=5, connection_type=None):
+        # googleapiclient already asks for gzip, so both shaping modes leave the encoding headers alone
+        if connection_type is None:
+            connection_type = self._connection_types[uri.split(':', 1)[0].lower()]
+        _wire_bytes.count = 0
+        response, content = super().request(uri, method, body, headers, redirections, connection_type)
+        get_payload_meter().record(_wire_bytes.count, len(content or b''))
+        return response, content
+
+# Shared YouTube API clients
+class YouTubeClientPool:
+    """Thread-safe pool of keep-alive YouTube clients, one set per API key"""
+
+    def __init__(self, timeout: int = 30):
+        self._timeout = timeout
+        self._lock = threading.Lock()
+        self._idle = {}
+        # The bundled discovery document is static, so parse it only once
+        from googleapiclient.discovery_cache import get_static_doc
+        self._discovery = json.loads(get_static_doc('youtube', 'v3'))
+
+    def _build(self, api_key: str):
+        # Each client owns its own httplib2.Http, which keeps its connections alive
+        from googleapiclient.discovery import build_from_document
+        return build_from_document(
+            self._discovery,
+            developerKey=api_key,
+            http=MeteredHttp(timeout=self._timeout)
+        )
+
+    @contextmanager
+    def client(self, api_key: str):
+        """Check out a client for api_key; httplib2 is not thread-safe, so never share one concurrently"""
+        with self._lock:
+            idle = self._idle.setdefault(api_key, [])
+            youtube = idle.pop() if idle else None
+        if youtube is None:
+            youtube = self._build(api_key)
+        try:
+            yield youtube
+        finally:
+            with self._lock:
+                self._idle[api_key].append(youtube)
+
+@st.cache_resource
+def get_youtube_pool() -> YouTubeClientPool:
+    """Process-wide client pool shared by all sessions"""
+    return YouTubeClientPool()
+
+# Conditional requests and split static/volatile video metadata
+class VideoMetadataStore:
+    """ETag-validated responses plus static video fields, shared across sessions"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # request key -> last response (carries its etag); evicting one only costs a full response next time
+        self._responses = BoundedCache('etag responses', int(ETAG_CACHE_BUDGET_MB * 1024 ** 2))
+        self.static = {}      # video id -> fields that never change after upload
+        self._pruned_at = 0.0
+
+    def execute(self, request, key: Tuple) -> Dict:
+        """Execute request with If-None-Match, reusing the stored response on 304"""
+        cached = self._responses.get(key)
+        if cached and cached.get('etag'):
+            request.headers['If-None-Match'] = cached['etag']
+        try:
+            response = get_retry_policy().call(request.execute)
+        except HttpError as e:
+            if cached and e.resp.status == 304:
+                return cached
+            raise
+        if response.get('etag'):
+            self._responses.put(key, response)
+        return response
+
+    def remember_static(self, video: Dict):
+        """Keep the fields of a full videos.list item that do not change"""
+        import isodate
+        duration_seconds = isodate.parse_duration(video['contentDetails']['duration']).total_seconds()
+        with self._lock:
+            self.static[video['id']] = {
+                'id': video['id'],
+                'title': video['snippet']['title'],
+                'published_at': video['snippet']['publishedAt'],
+                'duration_seconds': duration_seconds,
+                'is_short': duration_seconds <= 181,
+                'thumbnail': video['snippet']['thumbnails']['medium']['url']
+            }
+            if time.monotonic() - self._pruned_at > 3600:
+                self._forget_old()
+
+    def _forget_old(self):
+        # Videos published before every time range are never shown again; without this the
+        # store grows by every upload the process has ever seen (caller holds the lock)
+        cutoff = datetime.now().astimezone() - RETAIN_FOR
+        self.static = {
+            video_id: fields for video_id, fields in self.static.items()
+            if parse_published(fields['published_at']) >= cutoff
+        }
+        self._pruned_at = time.monotonic()
+
+@st.cache_resource
+def get_retry_policy() -> RetryPolicy:
+    """Process-wide retry policy; its rate limiter and retry budget are shared by every session's requests"""
+    return RetryPolicy(AdaptiveRateLimiter(), shared_budget=RetryBudget())
+
+@st.cache_resource
+def get_metadata_store() -> VideoMetadataStore:
+    """Process-wide ETag and static metadata store"""
+    return VideoMetadataStore()
+
+def build_video_record(static: Dict, statistics: Dict) -> Dict:
+    """Combine stored static fields with fresh statistics into one video row"""
+    return {
+        'id': static['id'],
+        'title': static['title'],
+        'published_at': static['published_at'],
+        'duration_seconds': static['duration_seconds'],
+        'is_short': static['is_short'],
+        'views': int(statistics.get('viewCount', 0)),
+        'likes': int(statistics.get('likeCount', 0)),
+        'comments': int(statistics.get('commentCount', 0)),
+        'thumbnail': static['thumbnail']
+    }
+
+# API keys rotate when one runs out of quota
+class ApiKeyRing:
+    """The configured YouTube keys and which one is current, shared by every session"""
+
+    def __init__(self, keys: List[str]):
+        self.keys = list(keys)
+        self._index = 0
+        self._lock = threading.Lock()
+
+    def current(self) -> str:
+        return self.keys[self._index] if self.keys else ''
+
+    def rotate(self, exhausted_key: str) -> str:
+        """Move past exhausted_key (unless another thread already has) and return the new current key"""
+        with self._lock:
+            if self.keys and self.keys[self._index] == exhausted_key:
+                self._index = (self._index + 1) % len(self.keys)
+            return self.current()
+
+@st.cache_resource
+def get_key_ring() -> ApiKeyRing:
+    """Process-wide API key ring"""
+    return ApiKeyRing(DEFAULT_YOUTUBE_KEYS)
+
+@st.cache_resource
+def get_video_cache() -> BoundedCache:
+    """Per-channel video frames, shared by every session and bounded by VIDEO_CACHE_BUDGET_MB"""
+    return BoundedCache('channel videos', int(VIDEO_CACHE_BUDGET_MB * 1024 ** 2))
+
+@st.cache_resource
+def get_freshness_scheduler() -> FreshnessScheduler:
+    """Process-wide video statistics and their refresh tiers"""
+    return FreshnessScheduler()
+
+def clear_video_cache():
+    get_video_cache().clear()
+    get_freshness_scheduler().clear()
+
+def channel_check_ttl(frame: pd.DataFrame, channel_id: str, uploads_playlist_id) -> float:
+    """Seconds a channel frame stays cached: until its hottest freshness tier is due again"""
+    if not uploads_playlist_id:
+        return SEARCH_LISTING_TTL
+    published = frame['published_at'].dt.to_pydatetime().tolist() if len(frame) > 0 else []
+    return get_freshness_scheduler().next_check(channel_id, published).total_seconds()
+
+def fetch_channel_data(channel_name, channel_id, start_date, api_key, uploads_playlist_id=None) -> pd.DataFrame:
+    """One channel's videos as a shared frame (errors are raised, so they are never cached)
+
+    The frame is cached until the channel's hottest freshness tier is due; rebuilding it
+    relists uploads and refetches statistics only for the videos whose tier is due. The key
+    leaves out api_key: every key returns the same videos, so rotating keys does not
+    duplicate entries.
+    """
+    def fetch():
+        key = api_key
+        keys_left = max(1, len(get_key_ring().keys))
+        while True:
+            try:
+                with get_youtube_pool().client(key) as youtube:
+                    videos = fetch_channel_videos(youtube, channel_id, start_date, uploads_playlist_id=uploads_playlist_id)
+                break
+            except HttpError as e:
+                # Transient and rate-limit errors were already retried per request by the retry policy
+                keys_left -= 1
+                if classify_error(e) != 'quota' or keys_left <= 0:
+                    raise
+                key = get_key_ring().rotate(key)
+        for video in videos:
+            video['channel'] = channel_name
+        frame = videos_frame(videos)
+        frame.attrs['cache_token'] = f"{channel_id}:{start_date:%Y%m%d}:{time.monotonic_ns()}"
+        return frame
+
+    return get_video_cache().get_or_compute(
+        (channel_id, channel_name, start_date, uploads_playlist_id), fetch,
+        ttl=lambda frame: channel_check_ttl(frame, channel_id, uploads_playlist_id),
+        label=f"{channel_name} since {start_date:%m/%d}"
+    )
+
+def combine_channel_frames(frames: List[pd.DataFrame]) -> pd.DataFrame:
+    """Concatenate per-channel frames; sessions combining the same cached frames share one result"""
+    frames = [frame for frame in frames if len(frame) > 0]
+    if not frames:
+        return videos_frame([])
+    tokens = tuple(frame.attrs.get('cache_token') for frame in frames)
+    if None in tokens:
+        return pd.concat(frames, ignore_index=True)
+    
+    def combine():
+        combined = pd.concat(frames, ignore_index=True)
+        # Lets per-dataset structures (filter indexes) be cached alongside the combined frame
+        combined.attrs['cache_token'] = ('combined',) + tokens
+        return combined
+    
+    return get_video_cache().get_or_compute(
+        ('combined',) + tokens, combine,
+        # Refreshed channels get new tokens, so an old combination is only worth keeping briefly
+        ttl=get_freshness_scheduler().tiers[0][1].total_seconds(),
+        label=f"{len(frames)} channels combined"
+    )
+
+def stream_channels_data(channel_list, start_date, api_key, channels_dict, channel_metadata=None, max_workers: int = 8):
+    """Yield (channel_name, videos frame, failure) for each channel as soon as its fetch completes"""
+    ctx = get_script_run_ctx()
+    
+    def attach_script_context():
+        # Lets workers use st.cache_data on behalf of the current session (no-op outside a script run)
+        if ctx is not None:
+            add_script_run_ctx(threading.current_thread(), ctx)
+    
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(channel_list))),
+                            initializer=attach_script_context) as executor:
+        futures = {
+            executor.submit(
+                fetch_channel_data, channel_name, channels_dict[channel_name], start_date, api_key,
+                (channel_metadata or {}).get(channels_dict[channel_name], {}).get('uploads_playlist_id')
+            ): channel_name
+            for channel_name in channel_list
+        }
+        for future in as_completed(futures):
+            channel_name = futures[future]
+            channel_id = channels_dict[channel_name]
+            try:
+                yield channel_name, future.result(), None
+            except HttpError as e:
+                error_reason = str(e)
+                if classify_error(e) == 'quota':
+                    yield channel_name, videos_frame([]), ("quota exceeded", f"API Quota exceeded for {channel_name}")
+                elif 'channelNotFound' in error_reason or 'invalidChannelId' in error_reason:
+                    yield channel_name, videos_frame([]), ("invalid ID", f"{channel_name}: Invalid channel ID - {channel_id}")
+                else:
+                    yield channel_name, videos_frame([]), ("API error", f"{channel_name}: API Error - {error_reason}")
+            except Exception as e:
+                yield channel_name, videos_frame([]), ("unexpected error", f"{channel_name}: Unexpected error - {str(e)}")
+
+def resolve_channel_ref(youtube, ref: str):
+    """Turn a channel ID, @handle or channel URL into a channel ID (None if it does not resolve)"""
+    ref = ref.strip()
+    match = re.search(r'(?:^|/channel/)(UC[\w-]{22})(?:$|[/?])', ref)
+    if match:
+        return match.group(1)
+    match = re.search(r'(?:^|youtube\.com/)(@[\w.\-]+)', ref)
+    if not match or youtube is None:
+        return None
+    request = youtube.channels().list(part="id", forHandle=match.group(1), fields="items/id")
+    response = get_retry_policy().call(request.execute)
+    items = response.get('items', [])
+    return items[0]['id'] if items else None
+
+def fetch_channel_metadata(youtube, channel_ids: List[str]) -> Dict[str, Dict]:
+    """Uploads playlist, title and subscriber count for each channel ID that exists"""
+    metadata = {}
+    fetched_at = datetime.now().isoformat()
+    for i in range(0, len(channel_ids), 50):
+        request = youtube.channels().list(
+            part="snippet,contentDetails,statistics",
+            id=",".join(channel_ids[i:i + 50]),
+            maxResults=50,
+            **response_fields(CHANNEL_FIELDS)
+        )
+        response = get_retry_policy().call(request.execute)
+        for item in response.get('items', []):
+            metadata[item['id']] = {
+                'uploads_playlist_id': item['contentDetails']['relatedPlaylists']['uploads'],
+                'title': item['snippet']['title'],
+                'subscribers': int(item['statistics'].get('subscriberCount', 0)),
+                'fetched_at': fetched_at
+            }
+    return metadata
+
+def read_channel_metadata_cache(path: str) -> Dict:
+    """Resolved handles and channel metadata saved by earlier runs"""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {'handles': {}, 'channels': {}}
+
+def write_channel_metadata_cache(path: str, cache: Dict):
+    """Persist resolved handles and channel metadata so later starts skip those lookups"""
+    try:
+        with open(path, 'w') as f:
+            json.dump(cache, f, indent=2)
+    except OSError:
+        pass  # Read-only filesystem - we just resolve again next start
+
+class RegistryUnavailable(Exception):
+    """Carries a registry resolved around API failures out of the cache, so it is retried later"""
+
+    def __init__(self, result: Tuple[List[Dict], Dict[str, Dict], List[str]]):
+        super().__init__("channel registry resolved with API errors")
+        self.result = result
+
+# Registries degraded by API or network failures, kept briefly so an outage is not retried on every rerun
+REGISTRY_RETRY_SECONDS = 60
+_degraded_registries: Dict[Tuple, Tuple[float, Tuple]] = {}
+
+def load_channel_registry(path: str, registry_mtime: float, api_key: str) -> Tuple[List[Dict], Dict[str, Dict], List[str]]:
+    """Load dashboards from the registry, resolving and validating every channel once
+
+    Returns (dashboards, channel metadata by ID, problems). Channels that do not resolve
+    are dropped from their dashboard and reported in problems instead of failing at fetch time.
+    When the API is unreachable, plain IDs, cached handles and stale metadata are used and
+    the lookups are retried after REGISTRY_RETRY_SECONDS.
+    """
+    key = (path, registry_mtime, api_key)
+    degraded = _degraded_registries.get(key)
+    if degraded and time.monotonic() - degraded[0] < REGISTRY_RETRY_SECONDS:
+        return degraded[1]
+    try:
+        return resolve_channel_registry(path, registry_mtime, api_key)
+    except RegistryUnavailable as e:
+        _degraded_registries[key] = (time.monotonic(), e.result)
+        return e.result
+
+@st.cache_data(show_spinner=False)
+def resolve_channel_registry(path: str, registry_mtime: float, api_key: str) -> Tuple[List[Dict], Dict[str, Dict], List[str]]:
+    """load_channel_registry's cached work; raises RegistryUnavailable instead of caching a degraded result"""
+    with open(path) as f:
+        dashboards = json.load(f)['dashboards']
+    
+    cache = read_channel_metadata_cache(CHANNEL_METADATA_CACHE_PATH)
+    handles, metadata = cache.setdefault('handles', {}), cache.setdefault('channels', {})
+    problems = []
+    api_failed = False
+    
+    # Plain IDs, channel URLs and handles resolved on an earlier start need no API call
+    resolved = {}
+    pending = []
+    for dashboard in dashboards:
+        for name, ref in dashboard['channels'].items():
+            channel_id = handles.get(ref) or resolve_channel_ref(None, ref)
+            if channel_id:
+                resolved[ref] = channel_id
+            else:
+                pending.append((name, ref))
+    
+    stale_before = (datetime.now() - CHANNEL_METADATA_MAX_AGE).isoformat()
+    
+    def stale_channels():
+        return sorted({
+            channel_id for channel_id in resolved.values()
+            if metadata.get(channel_id, {}).get('fetched_at', '') < stale_before
+        })
+    
+    if not api_key:
+        for name, ref in pending:
+            problems.append(f"{name}: {ref} needs a YouTube API key to resolve")
+    elif pending or stale_channels():
+        # Only build a client when something actually needs the API
+        with get_youtube_pool().client(api_key) as youtube:
+            # @handles -> channel IDs (handles rarely change, so they are cached indefinitely)
+            for name, ref in pending:
+                try:
+                    channel_id = resolve_channel_ref(youtube, ref)
+                except Exception as e:
+                    # Transport errors (DNS, timeouts, SSL) land here too once retries run out
+                    problems.append(f"{name}: could not resolve {ref} ({e})")
+                    api_failed = True
+                    continue
+                if channel_id is None:
+                    problems.append(f"{name}: {ref} does not resolve to a channel")
+                    continue
+                resolved[ref] = handles[ref] = channel_id
+            
+            # Fill in uploads playlist, title and subscriber count for new or stale channels
+            missing = stale_channels()
+            if missing:
+                try:
+                    found = fetch_channel_metadata(youtube, missing)
+                    metadata.update(found)
+                    for channel_id in missing:
+                        if channel_id not in found:
+                            metadata.pop(channel_id, None)
+                            resolved = {ref: cid for ref, cid in resolved.items() if cid != channel_id}
+                except Exception as e:
+                    # Keep whatever metadata we already had, however stale
+                    problems.append(f"Could not refresh channel metadata: {e}")
+                    api_failed = True
+    
+    write_channel_metadata_cache(CHANNEL_METADATA_CACHE_PATH, cache)
+    
+    for dashboard in dashboards:
+        channels = {}
+        for name, ref in dashboard['channels'].items():
+            if ref in resolved:
+                channels[name] = resolved[ref]
+            elif not any(problem.startswith(f"{name}:") for problem in problems):
+                problems.append(f"{name}: channel {ref} not found")
+        dashboard['channels'] = channels
+        dashboard['default_channels'] = [name for name in dashboard.get('default_channels', []) if name in channels]
+    
+    result = dashboards, {channel_id: metadata[channel_id] for channel_id in resolved.values() if channel_id in metadata}, problems
+    if api_failed:
+        raise RegistryUnavailable(result)
+    return result
+
+# Date ranges and per-channel fetching
+def get_time_range_dates(time_range: str) -> Tuple[datetime, datetime]:
+    """Convert time range string to datetime objects (excluding today)"""
+    end_date = datetime.now() - timedelta(days=1)  # Yesterday at current time
+    end_date = end_date.replace(hour=23, minute=59, second=59, microsecond=0)  # End of yesterday
+    
+    if time_range == "Last 1 Day":
+        start_date = end_date.replace(hour=0, minute=0, second=0)  # Start of yesterday
+    elif time_range == "Last 3 Days":
+        start_date = end_date - timedelta(days=2)
+        start_date = start_date.replace(hour=0, minute=0, second=0)  # Start of day
+    else:  # Last 7 Days
+        start_date = end_date - timedelta(days=6)
+        start_date = start_date.replace(hour=0, minute=0, second=0)  # Start of day
+    
+    return start_date, end_date
+
+def list_upload_ids(youtube, uploads_playlist_id: str, published_after: str,
+                    page_token=None) -> Tuple[Dict[str, str], str]:
+    """One page of a channel's uploads playlist: ({video ID: published at} in range, next page token)
+
+    The uploads playlist is newest first, so paging stops once a page reaches older videos.
+    At 1 quota unit per page it is far cheaper than search.list (100 units).
+    """
+    request = youtube.playlistItems().list(
+        part="contentDetails",
+        playlistId=uploads_playlist_id,
+        maxResults=50,
+        pageToken=page_token,
+        **response_fields(PLAYLIST_FIELDS)
+    )
+    response = get_metadata_store().execute(request, ('uploads', uploads_playlist_id, page_token))
+    video_ids = {}
+    reached_older = False
+    for item in response.get('items', []):
+        published = item['contentDetails'].get('videoPublishedAt')
+        if not published:
+            # Private and deleted uploads carry no publish date; they say nothing about the window's end
+            continue
+        if published[:19] >= published_after[:19]:
+            video_ids[item['contentDetails']['videoId']] = published
+        else:
+            reached_older = True
+    return video_ids, None if reached_older else response.get('nextPageToken')
+
+def refresh_video_statistics(youtube, video_ids: List[str]):
+    """Fetch statistics for up to 50 IDs into the freshness scheduler (plus static fields for new videos)"""
+    if not video_ids:
+        return
+    store = get_metadata_store()
+    scheduler = get_freshness_scheduler()
+    ids = ",".join(video_ids)
+    if all(video_id in store.static for video_id in video_ids):
+        # Title, duration and thumbnail are already stored - only statistics can change
+        videos_request = youtube.videos().list(
+            part="statistics",
+            id=ids,
+            **response_fields(VIDEO_STATISTICS_FIELDS)
+        )
+        videos_response = store.execute(videos_request, ('statistics', ids))
+    else:
+        # Get video details including duration and statistics
+        videos_request = youtube.videos().list(
+            part="snippet,statistics,contentDetails",
+            id=ids,
+            **response_fields(VIDEO_DETAIL_FIELDS)
+        )
+        videos_response = store.execute(videos_request, ('details', ids))
+        for video in videos_response.get('items', []):
+            store.remember_static(video)
+
+    for video in videos_response.get('items', []):
+        scheduler.record(video['id'], video['statistics'])
+
+def list_channel_video_ids(youtube, channel_id: str, published_after: str,
+                           uploads_playlist_id: str = None) -> Dict[str, str]:
+    """{video ID: published at (None when the listing does not say)} for every upload in range"""
+    video_ids = {}
+    next_page_token = None
+    store = get_metadata_store()
+    
+    while True:
+        if uploads_playlist_id:
+            page_ids, next_page_token = list_upload_ids(youtube, uploads_playlist_id, published_after, next_page_token)
+            video_ids.update(page_ids)
+            if not next_page_token:
+                break
+            continue
+        
+        request = youtube.search().list(
+            part="id" if RESPONSE_SHAPING else "id,snippet",
+            channelId=channel_id,
+            maxResults=50,  # API allows up to 50 per page
+            order="date",
+            type="video",
+            publishedAfter=published_after,
+            pageToken=next_page_token,  # Add pagination
+            **response_fields(SEARCH_FIELDS)
+        )
+        response = store.execute(request, ('search', channel_id, published_after, next_page_token))
+        
+        for item in response.get('items', []):
+            video_ids[item['id']['videoId']] = None
+        
+        # Check if there are more pages
+        next_page_token = response.get('nextPageToken')
+        if not next_page_token:
+            break
+    
+    return video_ids
+
+def fetch_channel_videos(youtube, channel_id: str, start_date: datetime, max_results: int = 100,
+                         uploads_playlist_id: str = None) -> List[Dict]:
+    """Fetch ALL videos from a channel within date range, refetching statistics only where their tier is due"""
+    store = get_metadata_store()
+    scheduler = get_freshness_scheduler()
+    listed = list_channel_video_ids(youtube, channel_id, start_date.isoformat() + "Z", uploads_playlist_id)
+    
+    published = {}
+    for video_id, published_at in listed.items():
+        published_at = published_at or store.static.get(video_id, {}).get('published_at')
+        published[video_id] = parse_published(published_at) if published_at else None
+    # The listing asked for uploads since start_date read as UTC, so that is the span it covered
+    due = scheduler.due(channel_id, published, start_date.replace(tzinfo=timezone.utc))
+    # Due videos from every tier share batches of 50
+    for i in range(0, len(due), 50):
+        refresh_video_statistics(youtube, due[i:i + 50])
+    
+    all_videos = []
+    for video_id in listed:
+        statistics = scheduler.statistics(video_id)
+        if video_id in store.static and statistics is not None:
+            all_videos.append(build_video_record(store.static[video_id], statistics))
+    return all_videos
+
+# Aggregations shared by the dashboard and the data service
+def videos_frame(videos: List[Dict]) -> pd.DataFrame:
+    """Video rows as a DataFrame with parsed publish times"""
+    df = pd.DataFrame(videos)
+    if len(df) > 0:
+        df['published_at'] = pd.to_datetime(df['published_at'])
+    return df
+
+def overview_totals(df: pd.DataFrame) -> Dict:
+    """The numbers behind the overview cards"""
+    total_views = int(df['views'].sum())
+    total_engagement = int(df['likes'].sum() + df['comments'].sum())
+    views_by_channel = df.groupby('channel')['views'].sum()
+    return {
+        'total_videos': len(df),
+        'shorts': int(df['is_short'].sum()),
+        'regular': int((~df['is_short']).sum()),
+        'total_views': total_views,
+        'avg_views': float(df['views'].mean()),
+        'total_engagement': total_engagement,
+        'engagement_rate': (total_engagement / total_views * 100) if total_views > 0 else 0,
+        'top_channel': views_by_channel.idxmax(),
+        'top_channel_views': int(views_by_channel.max())
+    }
+
+def channel_format_totals(df: pd.DataFrame, channels: List[str]) -> pd.DataFrame:
+    """Shorts, Regular Videos and Total views per channel, zero for channels without videos"""
+    if len(df) > 0:
+        by_format = df.groupby(['channel', 'is_short'])['views'].sum().unstack(fill_value=0)
+    else:
+        by_format = pd.DataFrame(columns=[True, False])
+    by_format = by_format.reindex(index=channels, columns=[True, False], fill_value=0)
+    
+    stats = pd.DataFrame({
+        'channel': channels,
+        'Shorts': by_format[True].to_numpy(dtype='int64'),
+        'Regular Videos': by_format[False].to_numpy(dtype='int64')
+    })
+    stats['Total'] = stats['Shorts'] + stats['Regular Videos']
+    return stats
+
+# Period-over-period comparison from stored daily aggregates
+class DailyAggregateStore:
+    """Per-day, per-channel, per-format rollups kept in SQLite, by the day they were observed
+
+    View counts are cumulative, so a day's numbers depend on when they were read. Each fetch
+    stores its window as observed at the window's end (as_of, the last fetched day); periods
+    are only compared against the same days-back window observed the same number of days
+    earlier, so both sides measure videos at the same ages. Repeat fetches on one as_of day
+    replace that observation.
+    """
+
+    def __init__(self, path: str):
+        self._path = path
+        self._lock = threading.Lock()
+        self._recorded = {}
+        with self._connect() as db:
+            db.executescript("""
+                -- Superseded by the as_of tables: those rows mixed numbers read at different video ages
+                DROP TABLE IF EXISTS daily;
+                DROP TABLE IF EXISTS coverage;
+                CREATE TABLE IF NOT EXISTS observed_daily (
+                    as_of TEXT, day TEXT, channel TEXT, is_short INTEGER,
+                    videos INTEGER, views INTEGER, likes INTEGER, comments INTEGER,
+                    PRIMARY KEY (as_of, day, channel, is_short)
+                );
+                -- Which channels each observation fetched for which days, so zero-video days still count
+                CREATE TABLE IF NOT EXISTS observed_coverage (
+                    as_of TEXT, day TEXT, channel TEXT, PRIMARY KEY (as_of, day, channel)
+                );
+            """)
+
+    def _connect(self):
+        return sqlite3.connect(self._path, timeout=30)
+
+    def record(self, df: pd.DataFrame, channels: List[str], start_date: datetime, end_date: datetime):
+        """Store df's rollups for channels on every day from start_date to end_date, as observed at end_date
+
+        A dataset already recorded (same cache token, or the same channels, window and totals)
+        is skipped, so reruns that only change widgets do not rewrite SQLite.
+        """
+        as_of = end_date.strftime('%Y-%m-%d')
+        fingerprint = df.attrs.get('cache_token') or (len(df), int(df['views'].sum()) if len(df) else 0)
+        key = (as_of, start_date.strftime('%Y-%m-%d'), tuple(sorted(channels)))
+        if self._recorded.get(key) == fingerprint:
+            return
+        days = [day.strftime('%Y-%m-%d') for day in pd.date_range(start_date.date(), end_date.date())]
+        rows = []
+        if len(df) > 0:
+            day_of = df['published_at'].dt.strftime('%Y-%m-%d')
+            in_range = df[day_of.isin(days) & df['channel'].isin(channels)]
+            rollup = in_range.groupby([day_of[in_range.index], 'channel', 'is_short']).agg(
+                videos=('id', 'count'), views=('views', 'sum'), likes=('likes', 'sum'), comments=('comments', 'sum')
+            )
+            rows = [(as_of, day, channel, int(is_short), *map(int, values))
+                    for (day, channel, is_short), values in zip(rollup.index, rollup.to_numpy())]
+        covered = [(as_of, day, channel) for day in days for channel in channels]
+        with self._lock, self._connect() as db:
+            db.executemany("DELETE FROM observed_daily WHERE as_of = ? AND day = ? AND channel = ?", covered)
+            db.executemany("INSERT INTO observed_daily VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            db.executemany("INSERT OR IGNORE INTO observed_coverage VALUES (?, ?, ?)", covered)
+            # Only the current observation date is worth remembering, and even that is capped
+            # like ChannelBaselines._folded, so the skip list stays small for the process's life
+            self._recorded = {recorded: value for recorded, value in self._recorded.items() if recorded[0] == as_of}
+            if len(self._recorded) >= 256:
+                self._recorded.clear()
+            self._recorded[key] = fingerprint
+
+    def totals(self, channels: List[str], as_of, days: int) -> pd.DataFrame:
+        """Views per (channel, is_short) for the days-long window ending on as_of, as observed then
+
+        NaN for channels whose observation on as_of did not cover every day of the window.
+        """
+        first, last = (as_of - timedelta(days=days - 1)).strftime('%Y-%m-%d'), as_of.strftime('%Y-%m-%d')
+        placeholders = ",".join("?" * len(channels))
+        with self._connect() as db:
+            views = pd.read_sql_query(
+                f"SELECT channel, is_short, SUM(views) AS views FROM observed_daily "
+                f"WHERE as_of = ? AND day BETWEEN ? AND ? AND channel IN ({placeholders}) GROUP BY channel, is_short",
+                db, params=[last, first, last, *channels]
+            )
+            coverage = pd.read_sql_query(
+                f"SELECT channel, COUNT(*) AS days FROM observed_coverage "
+                f"WHERE as_of = ? AND day BETWEEN ? AND ? AND channel IN ({placeholders}) GROUP BY channel",
+                db, params=[last, first, last, *channels]
+            )
+        index = pd.MultiIndex.from_product([channels, [True, False]], names=['channel', 'is_short'])
+        views['is_short'] = views['is_short'].astype(bool)
+        totals = views.set_index(['channel', 'is_short'])['views'].reindex(index, fill_value=0).astype(float)
+        complete = coverage.set_index('channel')['days'].reindex(channels, fill_value=0) >= days
+        totals[~complete.reindex(totals.index.get_level_values('channel')).to_numpy()] = float('nan')
+        return totals
+
+@st.cache_resource
+def get_daily_store() -> DailyAggregateStore:
+    """Process-wide daily aggregate store"""
+    return DailyAggregateStore(DAILY_AGGREGATES_PATH)
+
+def period_over_period(store: DailyAggregateStore, channels: List[str], end_day, days: int,
+                       lag_days: int = None) -> pd.DataFrame:
+    """Views for the days-long window ending on end_day against the window lag_days earlier (default: the
+    previous period), each as observed at its own end, so both count videos at the same ages
+    """
+    lag_days = lag_days or days
+    current = store.totals(channels, end_day, days)
+    previous = store.totals(channels, end_day - timedelta(days=lag_days), days)
+    comparison = pd.DataFrame({'views': current, 'previous_views': previous}).reset_index()
+    comparison['format'] = comparison['is_short'].map({True: 'Shorts', False: 'Regular Videos'})
+    comparison['change_pct'] = (comparison['views'] - comparison['previous_views']) / comparison['previous_views'] * 100
+    comparison.loc[comparison['previous_views'] == 0, 'change_pct'] = float('nan')
+    return comparison[['channel', 'format', 'views', 'previous_views', 'change_pct']]
@@ -0,0 +1,162 @@
+"""Retry policy for YouTube Data API requests
+
+Every request goes through RetryPolicy.call:
+
+- errors are classified as transient (5xx, dropped connections), rate limit
+  (rateLimitExceeded, 429), quota (quotaExceeded - handled by rotating keys, not here)
+  or permanent (bad IDs, 4xx, 304)
+- transient and rate-limit errors are retried with full-jitter exponential backoff
+  until the attempt limit or the per-request retry budget runs out
+- every backoff also draws from a RetryBudget shared by all requests, so during an
+  outage a refresh stalls for at most that budget before requests fail fast
+- rate-limit errors also slow every thread down through a shared AdaptiveRateLimiter,
+  which speeds back up to no pacing at all while requests succeed
+"""
+import random
+import socket
+import threading
+import time
+from typing import Callable, List, Optional
+from googleapiclient.errors import HttpError
+
+TRANSIENT_STATUSES = {500, 502, 503, 504}
+TRANSIENT_REASONS = {'backendError', 'internalError'}
+RATE_LIMIT_REASONS = {'rateLimitExceeded', 'userRateLimitExceeded'}
+QUOTA_REASONS = {'quotaExceeded', 'dailyLimitExceeded'}
+
+
+def error_reasons(error: HttpError) -> List[str]:
+    """The API's machine-readable reasons for an HttpError ("quotaExceeded", ...)"""
+    details = error.error_details if isinstance(error.error_details, list) else []
+    reasons = [d.get('reason', '') for d in details if isinstance(d, dict)]
+    if not reasons:
+        # Older responses only carry the reason inside the message text
+        text = str(error)
+        reasons = [r for r in TRANSIENT_REASONS | RATE_LIMIT_REASONS | QUOTA_REASONS if r in text]
+    return reasons
+
+
+def classify_error(error: Exception) -> str:
+    """'transient', 'rate_limit', 'quota' or 'permanent'"""
+    if isinstance(error, HttpError):
+        reasons = set(error_reasons(error))
+        if reasons & QUOTA_REASONS:
+            return 'quota'
+        if reasons & RATE_LIMIT_REASONS or error.resp.status == 429:
+            return 'rate_limit'
+        if reasons & TRANSIENT_REASONS or error.resp.status in TRANSIENT_STATUSES:
+            return 'transient'
+        # 304 Not Modified is answered from the ETag store; other 4xx will not change on retry
+        return 'permanent'
+    if isinstance(error, (ConnectionError, socket.timeout, TimeoutError)):
+        return 'transient'
+    # httplib2 and ssl failures on a dropped connection
+    if type(error).__name__ in ('ServerNotFoundError', 'SSLError', 'IncompleteRead', 'RemoteDisconnected'):
+        return 'transient'
+    return 'permanent'
+
+
+class AdaptiveRateLimiter:
+    """Shared pacing between requests: none while healthy, widened on each rate-limit signal"""
+
+    def __init__(self, min_interval: float = 0.05, first_step: float = 0.25, max_interval: float = 5.0,
+                 recovery: float = 0.9):
+        self.min_interval = min_interval
+        self.first_step = first_step
+        self.max_interval = max_interval
+        self.recovery = recovery
+        self.interval = 0.0
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self, sleep: Callable[[float], None] = time.sleep):
+        """Block until this thread's turn under the current interval (returns at once while it is 0)"""
+        with self._lock:
+            if self.interval == 0:
+                return
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            sleep(slot - now)
+
+    def on_success(self):
+        # Eases off gradually: from the first step it takes about 16 clean requests to stop pacing
+        with self._lock:
+            self.interval *= self.recovery
+            if self.interval < self.min_interval:
+                self.interval = 0.0
+
+    def on_rate_limit(self):
+        with self._lock:
+            self.interval = min(max(self.interval * 2, self.first_step), self.max_interval)
+
+
+class RetryBudget:
+    """Backoff seconds shared by every request, refilled evenly over a time window"""
+
+    def __init__(self, seconds: float = 30.0, window_s: float = 300.0, clock: Callable[[], float] = time.monotonic):
+        self.seconds = seconds
+        self.rate = seconds / window_s
+        self.clock = clock
+        self._available = seconds
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def draw(self, delay: float) -> bool:
+        """Take delay seconds from the budget; False (and nothing taken) when it cannot cover them"""
+        with self._lock:
+            now = self.clock()
+            self._available = min(self.seconds, self._available + (now - self._updated) * self.rate)
+            self._updated = now
+            if delay > self._available:
+                return False
+            self._available -= delay
+            return True
+
+
+class RetryPolicy:
+    """Backoff with jitter for transient and rate-limit errors, under a per-request retry budget"""
+
+    def __init__(self, limiter: AdaptiveRateLimiter, max_attempts: int = 5, base_delay: float = 0.5,
+                 max_delay: float = 8.0, retry_budget_s: float = 20.0, shared_budget: Optional[RetryBudget] = None,
+                 sleep: Callable[[float], None] = time.sleep, jitter: Callable[[], float] = random.random):
+        self.limiter = limiter
+        self.shared_budget = shared_budget
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_budget_s = retry_budget_s
+        self.sleep = sleep
+        self.jitter = jitter
+        # Counters for the sidebar; approximate under concurrency, which is fine for display
+        self.retries = 0
+        self.rate_limited = 0
+        self.gave_up = 0
+
+    def call(self, execute: Callable):
+        """Run execute(), retrying what is worth retrying; the last error is raised otherwise"""
+        waited = 0.0
+        for attempt in range(self.max_attempts):
+            self.limiter.wait(self.sleep)
+            try:
+                result = execute()
+            except Exception as e:
+                kind = classify_error(e)
+                if kind in ('quota', 'permanent'):
+                    raise
+                if kind == 'rate_limit':
+                    self.rate_limited += 1
+                    self.limiter.on_rate_limit()
+                # Full jitter: anywhere between 0 and the exponential cap
+                delay = self.jitter() * min(self.max_delay, self.base_delay * 2 ** attempt)
+                if (attempt + 1 == self.max_attempts or waited + delay > self.retry_budget_s
+                        or (self.shared_budget is not None and not self.shared_budget.draw(delay))):
+                    self.gave_up += 1
+                    raise
+                self.retries += 1
+                waited += delay
+                self.sleep(delay)
+                continue
+            self.limiter.on_success()
+            return result